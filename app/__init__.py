@@ -1,4 +1,4 @@
-from .database import SessionDep, engine, create_db_and_tables
 from .main import app
+from .database import SessionDep, engine, create_db_and_tables
 
 __all__ = ["app", "SessionDep", "engine", "create_db_and_tables"]
\ No newline at end of file
@@ -1,4 +1,7 @@
-from .security import get_current_active_user, UserDep, authenticate_user, create_access_token, get_hash_password, get_user
+from .security import get_current_active_user, UserDep, authenticate_user, create_access_token, get_hash_password, get_hash_password_in_pool, get_user, password_pool_stats
 from .config import settings
+from .cache import user_cache, listing_cache
+from .coalescing import WriteCoalescer
+from .metrics import MetricsMiddleware, ServerTimingMiddleware, request_metrics, format_metric
 
-__all__ = ["settings","get_current_active_user", "UserDep", "authenticate_user", "create_access_token", "get_user", "get_hash_password"]
\ No newline at end of file
+__all__ = ["settings","get_current_active_user", "UserDep", "authenticate_user", "create_access_token", "get_user", "get_hash_password", "get_hash_password_in_pool", "password_pool_stats", "user_cache", "listing_cache", "WriteCoalescer", "MetricsMiddleware", "ServerTimingMiddleware", "request_metrics", "format_metric"]
\ No newline at end of file
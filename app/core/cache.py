@@ -0,0 +1,235 @@
+# User cache section
+from collections import OrderedDict
+from collections.abc import Iterable
+import asyncio
+import json
+import time
+
+from sqlalchemy import event, inspect
+from sqlmodel import Session
+
+from app.models.user import User
+from app.core.config import settings
+
+class MemoryCacheBackend:
+    """Bounded LRU with per-entry expiry, local to one worker process."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> dict | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict, ttl: int):
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.entries.pop(key, None)
+
+    async def clear(self):
+        self.entries.clear()
+
+class RedisCacheBackend:
+    """Shares cached users between uvicorn workers through a Redis-compatible store."""
+
+    def __init__(self, url: str, prefix: str = "user:"):
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError("USER_CACHE_BACKEND=redis requires the redis package (pip install redis)") from exc
+
+        self.client = redis_asyncio.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> dict | None:
+        raw = await self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: dict, ttl: int):
+        await self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    async def delete(self, *keys: str):
+        await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+class NullCacheBackend:
+    async def get(self, key: str) -> dict | None:
+        return None
+
+    async def set(self, key: str, value: dict, ttl: int):
+        pass
+
+    async def delete(self, *keys: str):
+        pass
+
+    async def clear(self):
+        pass
+
+class UserCache:
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl     = ttl
+        self.stats   = {"hits": 0, "misses": 0}
+
+    async def _get(self, key: str) -> User | None:
+        data = await self.backend.get(key)
+        if data is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return User.model_validate(data)
+
+    async def get_by_username(self, username: str) -> User | None:
+        return await self._get(f"name:{username}")
+
+    async def get_by_id(self, user_id: int) -> User | None:
+        return await self._get(f"id:{user_id}")
+
+    async def set(self, user: User):
+        # password hashes never leave the database, cached users only serve token lookups
+        data = user.model_dump(exclude={"hashed_password"})
+        await self.backend.set(f"name:{user.username}", data, self.ttl)
+        await self.backend.set(f"id:{user.id}", data, self.ttl)
+
+    async def invalidate(self, usernames: Iterable[str] = (), user_ids: Iterable[int] = ()):
+        keys = [f"name:{username}" for username in usernames] + [f"id:{user_id}" for user_id in user_ids]
+        if keys:
+            await self.backend.delete(*keys)
+
+    async def clear(self):
+        await self.backend.clear()
+
+def create_cache_backend():
+    if settings.USER_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.USER_CACHE_URL)
+    if settings.USER_CACHE_BACKEND == "none":
+        return NullCacheBackend()
+    return MemoryCacheBackend(settings.USER_CACHE_MAX_SIZE)
+
+user_cache = UserCache(create_cache_backend(), settings.USER_CACHE_TTL_SECONDS)
+
+class ListingCache:
+    """Rendered task listing pages, local to one worker process and bounded by
+    entry count and body bytes.
+
+    Every entry remembers the tasks version it was rendered at and a lookup
+    with another version drops it, so pages made stale by a write in another
+    worker are never served. Writes in this worker drop the user's pages at once."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        # (user_id, query) -> (version, body)
+        self.entries: OrderedDict[tuple[int, tuple], tuple[int, bytes]] = OrderedDict()
+        self.keys_by_user: dict[int, set[tuple[int, tuple]]] = {}
+        self.size  = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, user_id: int, version: int, query: tuple) -> bytes | None:
+        key   = (user_id, query)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] != version:
+            self._remove(key)
+            self.stats["invalidations"] += 1
+            entry = None
+
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, user_id: int, version: int, query: tuple, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+
+        key = (user_id, query)
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (version, body)
+        self.keys_by_user.setdefault(user_id, set()).add(key)
+        self.size += len(body)
+
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+            self.stats["evictions"] += 1
+
+    def invalidate(self, user_id: int):
+        for key in self.keys_by_user.get(user_id, set()).copy():
+            self._remove(key)
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.keys_by_user.clear()
+        self.size = 0
+
+    def _remove(self, key: tuple[int, tuple]):
+        version, body = self.entries.pop(key)
+        self.size -= len(body)
+        user_keys = self.keys_by_user[key[0]]
+        user_keys.discard(key)
+        if not user_keys:
+            del self.keys_by_user[key[0]]
+
+listing_cache = ListingCache(settings.LISTING_CACHE_MAX_ENTRIES, settings.LISTING_CACHE_MAX_BYTES)
+
+# Invalidation: every flushed insert/update/delete of a User is remembered on the
+# session and dropped from the cache once the transaction commits
+@event.listens_for(Session, "after_flush")
+def collect_stale_users(session, flush_context):
+    stale = session.info.setdefault("stale_users", (set(), set()))
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, User):
+            continue
+
+        stale[0].add(obj.username)
+        stale[0].update(inspect(obj).attrs.username.history.deleted or ())
+        if obj.id is not None:
+            stale[1].add(obj.id)
+
+pending_invalidations: set[asyncio.Task] = set()
+
+@event.listens_for(Session, "after_commit")
+def invalidate_stale_users(session):
+    usernames, user_ids = session.info.pop("stale_users", (set(), set()))
+    if not (usernames or user_ids):
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # plain sync session outside of the app (scripts, CLI)
+        asyncio.run(user_cache.invalidate(usernames, user_ids))
+        return
+
+    task = loop.create_task(user_cache.invalidate(usernames, user_ids))
+    pending_invalidations.add(task)
+    task.add_done_callback(pending_invalidations.discard)
+
+@event.listens_for(Session, "after_rollback")
+def forget_stale_users(session):
+    session.info.pop("stale_users", None)
@@ -0,0 +1,89 @@
+# Write coalescing section
+from bisect import bisect_left
+import asyncio
+
+from app.core.metrics import format_labels, request_query_stats
+
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+class WriteCoalescer:
+    """Group commit: writes submitted by concurrent requests wait up to max_delay
+    seconds (or until max_batch rows are pending) and are handed to flush()
+    together, so they share one transaction.
+
+    flush() gets the submitted items in order and returns one result per item,
+    every submitter gets its own result back or the exception of the batch."""
+
+    def __init__(self, flush, max_delay: float, max_batch: int, buckets: tuple[int, ...] = BATCH_SIZE_BUCKETS):
+        self.flush     = flush
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.buckets   = buckets
+        self.pending: list[tuple[object, asyncio.Future]] = []
+        self.pending_rows = 0
+        self.timer: asyncio.TimerHandle | None = None
+        self.flushing: set[asyncio.Task] = set()
+        self.stats = {"batches": 0, "items": 0, "rows": 0}
+        # rows per batch, [count per bucket..., count above the last bucket]
+        self.batch_sizes = [0] * (len(buckets) + 1)
+
+    async def submit(self, item, rows: int = 1):
+        loop   = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((item, future))
+        self.pending_rows += rows
+
+        if self.pending_rows >= self.max_batch:
+            self._start_flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_delay, self._start_flush)
+        return await future
+
+    def _start_flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        batch, rows = self.pending, self.pending_rows
+        self.pending, self.pending_rows = [], 0
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._flush(batch, rows))
+        self.flushing.add(task)
+        task.add_done_callback(self.flushing.discard)
+
+    async def _flush(self, batch: list[tuple[object, asyncio.Future]], rows: int):
+        # the task copied the context of the request which started the batch,
+        # queries written for all submitters are not counted against that one
+        request_query_stats.set(None)
+        self.stats["batches"] += 1
+        self.stats["items"]   += len(batch)
+        self.stats["rows"]    += rows
+        self.batch_sizes[bisect_left(self.buckets, rows)] += 1
+
+        try:
+            results = await self.flush([item for item, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        # a submitter which went away (client disconnect) has a cancelled future
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def render(self, name: str, description: str) -> list[str]:
+        lines = [
+            f"# HELP {name} {description}",
+            f"# TYPE {name} histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.batch_sizes):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels({'le': bound})} {cumulative}")
+        lines.append(f"{name}_sum {self.stats['rows']}")
+        lines.append(f"{name}_count {cumulative}")
+        return lines
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Literal
 import os
 
 class Settings(BaseSettings):
@@ -8,11 +9,58 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
 
     #Database
-    DATABASE_URL: str = "sqlite:///.app/database.bd"
+    DATABASE_URL: str = "sqlite:///database.db"
+    DB_POOL_SIZE:     int  = 5
+    DB_MAX_OVERFLOW:  int  = 10
+    DB_POOL_TIMEOUT:  int  = 30
+    DB_POOL_RECYCLE:  int  = -1
+    DB_POOL_PRE_PING: bool = False
+
+    #SQLite performance profile, applied on every new connection when enabled
+    SQLITE_PERFORMANCE_MODE: bool = False
+    SQLITE_JOURNAL_MODE:     Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = "WAL"
+    SQLITE_SYNCHRONOUS:      Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS:  int = 5000
+    SQLITE_MMAP_SIZE:        int = 268435456
+    SQLITE_CACHE_SIZE:       int = -64000
+    SQLITE_TEMP_STORE:       Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+
+    #Per-request query budgets, requests going over are logged (0 = no budget)
+    QUERY_COUNT_BUDGET:   int   = 0
+    QUERY_TIME_BUDGET_MS: float = 0
 
     #Limits
     MAX_LETERS_ADMIN: int = 1000000
     MAX_LETERS_USER:  int = 1000
+    MAX_BATCH_IDS:    int = 5000
+
+    #Streaming
+    STREAM_BATCH_SIZE: int = 1000
+
+    #Group commit for /post/: inserts of concurrent requests wait up to the delay
+    #(or until the batch is full) and are written in one transaction
+    POST_COALESCING_ENABLED:    bool  = False
+    POST_COALESCE_MAX_DELAY_MS: float = 2
+    POST_COALESCE_MAX_BATCH:    int   = 500
+
+    #Password hashing pool
+    PASSWORD_POOL_SIZE:      int = 4
+    PASSWORD_POOL_MAX_QUEUE: int = 64
+
+    #User cache
+    USER_CACHE_BACKEND:     Literal["memory", "redis", "none"] = "memory"
+    USER_CACHE_URL:         str = "redis://localhost:6379/0"
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE:    int = 10000
+
+    #Verified token cache
+    TOKEN_CACHE_ENABLED:  bool = True
+    TOKEN_CACHE_MAX_SIZE: int  = 10000
+
+    #Listing cache, rendered pages of / per user and query parameters
+    LISTING_CACHE_ENABLED:     bool = True
+    LISTING_CACHE_MAX_ENTRIES: int  = 10000
+    LISTING_CACHE_MAX_BYTES:   int  = 67108864
     
     model_config = SettingsConfigDict(
         env_file          = os.getenv("ENV_FILE", ".env"),
@@ -0,0 +1,169 @@
+# Request metrics section
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.queries")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + "}"
+
+def format_metric(name: str, kind: str, description: str, samples: list[tuple[dict, float]]) -> list[str]:
+    """Renders one metric family in the Prometheus text exposition format."""
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{format_labels(labels)} {value}" for labels, value in samples)
+    return lines
+
+class RequestMetrics:
+    """Request counters and latency histograms keyed by route template,
+    so /switch/1/ and /switch/2/ land in the same series."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets     = buckets
+        self.requests    = defaultdict(int)
+        # (method, route) -> [count per bucket..., count above the last bucket]
+        self.latency     = {}
+        self.latency_sum = defaultdict(float)
+        self.in_flight   = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float):
+        self.requests[(method, route, status)] += 1
+
+        counts = self.latency.get((method, route))
+        if counts is None:
+            counts = self.latency[(method, route)] = [0] * (len(self.buckets) + 1)
+        counts[bisect_left(self.buckets, seconds)] += 1
+        self.latency_sum[(method, route)] += seconds
+
+    def render(self) -> list[str]:
+        lines = format_metric(
+            "http_requests_total", "counter", "Total HTTP requests by route template and status code.",
+            [({"method": method, "route": route, "status": status}, count)
+             for (method, route, status), count in sorted(self.requests.items())]
+        )
+
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency by route template.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), counts in sorted(self.latency.items()):
+            labels     = {"method": method, "route": route}
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                lines.append(f"http_request_duration_seconds_bucket{format_labels({**labels, 'le': bound})} {cumulative}")
+            lines.append(f"http_request_duration_seconds_sum{format_labels(labels)} {self.latency_sum[(method, route)]}")
+            lines.append(f"http_request_duration_seconds_count{format_labels(labels)} {cumulative}")
+
+        lines += format_metric(
+            "http_requests_in_flight", "gauge", "HTTP requests currently being served.",
+            [({}, self.in_flight)]
+        )
+        return lines
+
+request_metrics = RequestMetrics()
+
+class MetricsMiddleware:
+    """Plain ASGI middleware, cheaper per request than BaseHTTPMiddleware."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        request_metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_metrics.in_flight -= 1
+            # the router leaves the matched route in the scope, unknown paths share one label
+            route = scope.get("route")
+            request_metrics.observe(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code,
+                time.perf_counter() - start
+            )
+
+class QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count   = 0
+        self.seconds = 0.0
+
+# Set for the lifetime of a request, filled by the cursor hooks on the engine
+request_query_stats: ContextVar[QueryStats | None] = ContextVar("request_query_stats", default=None)
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.query_started_at = time.perf_counter()
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = request_query_stats.get()
+    if stats is not None:
+        stats.count   += 1
+        stats.seconds += time.perf_counter() - context.query_started_at
+
+class ServerTimingMiddleware:
+    """Adds Server-Timing with the request's query count and time spent in the
+    database, logging requests which go over the configured budgets."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = request_query_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.seconds * 1000:.2f}, db-count;desc="{stats.count}", '
+                    f'app;dur={(time.perf_counter() - start) * 1000:.2f}'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_query_stats.reset(token)
+            over_count = settings.QUERY_COUNT_BUDGET   and stats.count > settings.QUERY_COUNT_BUDGET
+            over_time  = settings.QUERY_TIME_BUDGET_MS and stats.seconds * 1000 > settings.QUERY_TIME_BUDGET_MS
+            if over_count or over_time:
+                logger.warning(
+                    "%s %s ran %d queries in %.2f ms, over the budget of %d queries / %.2f ms",
+                    scope["method"], scope["path"], stats.count, stats.seconds * 1000,
+                    settings.QUERY_COUNT_BUDGET, settings.QUERY_TIME_BUDGET_MS
+                )
@@ -1,6 +1,11 @@
 # User Authentification section
 from typing import Annotated
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import threading
+import time
 
 from sqlmodel import select
 from fastapi.security import OAuth2PasswordBearer
@@ -19,6 +24,7 @@ from pydantic import BaseModel
 from app.models.user import User
 from app.database import SessionDep
 from app.core.config import settings
+from app.core.cache import user_cache, MemoryCacheBackend
 
 class Token(BaseModel):
     access_token: str
@@ -72,15 +78,64 @@ def verify_password(plain_password, hashed_password):
 def get_hash_password(password):
     return pwd_context.hash(password)
 
-def get_user(session: SessionDep, username: str) -> User | None:
-    user = session.exec(select(User).where(User.username == username)).first()
+# bcrypt releases the GIL, so a small thread pool is enough to keep
+# hashing/verification off the event loop
+password_executor = ThreadPoolExecutor(
+    max_workers        = settings.PASSWORD_POOL_SIZE,
+    thread_name_prefix = "password-pool"
+)
+
+password_pool_stats = {
+    "in_flight":          0,
+    "completed":          0,
+    "rejected":           0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max":   0.0,
+}
+password_pool_lock = threading.Lock()
+
+async def run_in_password_pool(func, *args):
+    with password_pool_lock:
+        if password_pool_stats["in_flight"] >= settings.PASSWORD_POOL_SIZE + settings.PASSWORD_POOL_MAX_QUEUE:
+            password_pool_stats["rejected"] += 1
+            raise HTTPException(
+                status_code = status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail      = "Server is busy, try again later",
+                headers     = {"Retry-After": "1"},
+            )
+        password_pool_stats["in_flight"] += 1
+
+    submitted_at = time.perf_counter()
+
+    def job():
+        waited = time.perf_counter() - submitted_at
+        with password_pool_lock:
+            password_pool_stats["wait_seconds_total"] += waited
+            password_pool_stats["wait_seconds_max"] = max(password_pool_stats["wait_seconds_max"], waited)
+        return func(*args)
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, job)
+    finally:
+        with password_pool_lock:
+            password_pool_stats["in_flight"] -= 1
+            password_pool_stats["completed"] += 1
+
+async def verify_password_in_pool(plain_password, hashed_password):
+    return await run_in_password_pool(verify_password, plain_password, hashed_password)
+
+async def get_hash_password_in_pool(password):
+    return await run_in_password_pool(get_hash_password, password)
+
+async def get_user(session: SessionDep, username: str) -> User | None:
+    user = (await session.exec(select(User).where(User.username == username))).first()
     return user
 
-def authenticate_user(session: SessionDep, username: str, password: str) -> User | None:
-    user = get_user(session, username)
+async def authenticate_user(session: SessionDep, username: str, password: str) -> User | None:
+    user = await get_user(session, username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_in_pool(password, user.hashed_password):
         return None
     return user
 
@@ -96,6 +151,25 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+# Verified claims keyed by token digest, so a token presented again within its
+# lifetime skips signature verification
+token_cache = MemoryCacheBackend(settings.TOKEN_CACHE_MAX_SIZE)
+
+async def decode_access_token(token: str) -> dict:
+    if not settings.TOKEN_CACHE_ENABLED:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    key     = hashlib.sha256(token.encode()).hexdigest()
+    payload = await token_cache.get(key)
+    if payload is not None:
+        return payload
+    
+    # expired tokens fall out of the cache and fail here with ExpiredSignatureError
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if "exp" in payload:
+        await token_cache.set(key, payload, payload["exp"] - time.time())
+    return payload
+
 async def get_current_user(
         session: SessionDep, 
         token:   Annotated[str, Depends(oauth2_scheme)] = None
@@ -110,7 +184,7 @@ async def get_current_user(
     if not token:
         raise credentials_exception
     try:
-        payload  = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload  = await decode_access_token(token)
         username = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -120,9 +194,13 @@ async def get_current_user(
     except InvalidTokenError:
         raise credentials_exception
     
-    user = get_user(session=session, username=token_data.username)
+    user = await user_cache.get_by_username(token_data.username)
     if user is None:
-        raise credentials_exception
+        user = await get_user(session=session, username=token_data.username)
+        if user is None:
+            raise credentials_exception
+        
+        await user_cache.set(user)
     
     return user
 
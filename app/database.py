@@ -1,25 +1,211 @@
 from typing import Annotated
-import os
-from sqlmodel import create_engine, Session, SQLModel
+import time
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import inspect, text, exc, event, make_url, select, func, case, literal, bindparam
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine
 from fastapi import Depends
 
+from app.core.config import settings
+from app.core.metrics import before_cursor_execute, after_cursor_execute
+
 # DataBase setting section
-sql_url = os.environ.get("DATABASE_URL", "sqlite:///database.db")
+ASYNC_DRIVERS = {
+    "sqlite":     "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres":   "postgresql+asyncpg",
+}
+
+def get_async_url(url: str) -> str:
+    """Swaps a plain/sync driver in the url for its async counterpart,
+    urls which already name an async driver are returned unchanged."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect in ASYNC_DRIVERS and scheme in (dialect, f"{dialect}+psycopg2", f"{dialect}+pysqlite"):
+        return f"{ASYNC_DRIVERS[dialect]}{sep}{rest}"
+    return url
+
+# Time spent waiting for a free pooled connection, per worker process
+pool_stats = {
+    "checkouts":          0,
+    "timeouts":           0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max":   0.0,
+}
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool which records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats["timeouts"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            pool_stats["checkouts"]          += 1
+            pool_stats["wait_seconds_total"] += waited
+            pool_stats["wait_seconds_max"]    = max(pool_stats["wait_seconds_max"], waited)
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers go on while a write is in progress and NORMAL sync
+    # only fsyncs at checkpoints instead of on every commit
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.execute(f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}")
+    cursor.close()
+
+def create_app_engine(url: str):
+    async_url = make_url(get_async_url(url))
+    if async_url.get_backend_name() == "sqlite":
+        connect_args = {"check_same_thread": False}
+    else: connect_args = {}
+
+    # in-memory sqlite lives on a single static connection, there is nothing to size
+    if async_url.get_backend_name() == "sqlite" and async_url.database in (None, "", ":memory:"):
+        app_engine = create_async_engine(async_url, connect_args=connect_args)
+    else:
+        app_engine = create_async_engine(
+            async_url,
+            connect_args  = connect_args,
+            poolclass     = TimedQueuePool,
+            pool_size     = settings.DB_POOL_SIZE,
+            max_overflow  = settings.DB_MAX_OVERFLOW,
+            pool_timeout  = settings.DB_POOL_TIMEOUT,
+            pool_recycle  = settings.DB_POOL_RECYCLE,
+            pool_pre_ping = settings.DB_POOL_PRE_PING,
+        )
+
+        if async_url.get_backend_name() == "sqlite" and settings.SQLITE_PERFORMANCE_MODE:
+            event.listen(app_engine.sync_engine, "connect", set_sqlite_pragmas)
 
-if sql_url.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-else: connect_args={}
+    event.listen(app_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(app_engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    return app_engine
 
-engine = create_engine(sql_url, connect_args=connect_args)
+def get_pool_status(bind=None) -> dict:
+    pool   = (bind or engine).pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size        = pool.size(),
+            checked_out = pool.checkedout(),
+            checked_in  = pool.checkedin(),
+            overflow    = max(pool.overflow(), 0),
+        )
+    status.update(pool_stats)
+    return status
 
-def get_session():
-    with Session(engine) as session:
+sql_url = settings.DATABASE_URL
+engine  = create_app_engine(sql_url)
+
+async def get_session():
+    async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
+
+# Indexes dropped from the models which existing databases may still carry
+RETIRED_INDEXES = {
+    "task": ["ix_task_user_id"],
+}
+
+def migrate_indexes(connection):
+    """create_all skips tables that already exist together with their indexes,
+    so indexes added to the models later are created (and retired ones dropped) here."""
+    inspector = inspect(connection)
+    preparer  = connection.dialect.identifier_preparer
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(connection)
+
+        for name in RETIRED_INDEXES.get(table.name, []):
+            if name in existing:
+                connection.execute(text(f"DROP INDEX {preparer.quote(name)}"))
+
+def backfill_task_stats(connection):
+    """Counts the tasks of every user once, so counters kept up by the writes
+    start from the right numbers when their table is added to an existing database."""
+    task  = SQLModel.metadata.tables["task"]
+    stats = SQLModel.metadata.tables["taskstats"]
+    connection.execute(stats.insert().from_select(
+        ["user_id", "version", "total", "complete"],
+        select(task.c.user_id, literal(0), func.count(), func.sum(case((task.c.is_complete, 1), else_=0)))
+        .group_by(task.c.user_id)
+    ))
+
+# Filled from the existing data when the table is created
+TABLE_BACKFILLS = {
+    "taskstats": backfill_task_stats,
+}
+
+# Full-text search over task_content. SQLite gets an FTS5 table reading the
+# content from task and kept in sync by triggers, so every write path (the app,
+# batches, bulk seeding) updates it. user_id is indexed too, a search then only
+# walks the postings of one user. Switching a task does not touch the index
+SEARCH_CONFIG = "simple"
+SQLITE_SEARCH_TABLE = "task_fts"
+SQLITE_SEARCH_TABLE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SEARCH_TABLE} USING fts5(task_content, user_id, content='task', content_rowid='id')"
+)
+SQLITE_SEARCH_TRIGGERS = {
+    "task_fts_insert": f"""CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE} (rowid, task_content, user_id) VALUES (new.id, new.task_content, new.user_id);
+    END""",
+    "task_fts_delete": f"""CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE} ({SQLITE_SEARCH_TABLE}, rowid, task_content, user_id) VALUES ('delete', old.id, old.task_content, old.user_id);
+    END""",
+    "task_fts_update": f"""CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF task_content, user_id ON task BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE} ({SQLITE_SEARCH_TABLE}, rowid, task_content, user_id) VALUES ('delete', old.id, old.task_content, old.user_id);
+        INSERT INTO {SQLITE_SEARCH_TABLE} (rowid, task_content, user_id) VALUES (new.id, new.task_content, new.user_id);
+    END""",
+}
+
+def create_search_index(connection):
+    """FTS5 table and triggers on SQLite, a GIN index over the content's tsvector
+    on PostgreSQL (which the planner matches to the same expression in queries)."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_task_content_search ON task USING gin (to_tsvector('{SEARCH_CONFIG}', task_content))"
+        ))
+    elif connection.dialect.name == "sqlite":
+        names   = [SQLITE_SEARCH_TABLE, *SQLITE_SEARCH_TRIGGERS]
+        present = set(connection.execute(
+            text("SELECT name FROM sqlite_master WHERE name IN :names").bindparams(bindparam("names", expanding=True)),
+            {"names": names}
+        ).scalars())
+        connection.execute(text(SQLITE_SEARCH_TABLE_DDL))
+        for statement in SQLITE_SEARCH_TRIGGERS.values():
+            connection.execute(text(statement))
+        if present != set(names):
+            # tasks written before the index existed, or while a trigger was missing
+            connection.execute(text(f"INSERT INTO {SQLITE_SEARCH_TABLE} ({SQLITE_SEARCH_TABLE}) VALUES ('rebuild')"))
+
+def get_missing_tables(connection) -> set[str]:
+    inspector = inspect(connection)
+    return {table.name for table in SQLModel.metadata.sorted_tables if not inspector.has_table(table.name)}
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+async def create_db_and_tables(bind=None):
+    async with (bind or engine).begin() as conn:
+        missing = await conn.run_sync(get_missing_tables)
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(migrate_indexes)
+        for name, backfill in TABLE_BACKFILLS.items():
+            if name in missing:
+                await conn.run_sync(backfill)
+        await conn.run_sync(create_search_index)
 
-def drop_db_and_tables():
-    SQLModel.metadata.drop_all(engine)
\ No newline at end of file
+async def drop_db_and_tables(bind=None):
+    async with (bind or engine).begin() as conn:
+        if conn.dialect.name == "sqlite":
+            await conn.execute(text(f"DROP TABLE IF EXISTS {SQLITE_SEARCH_TABLE}"))
+        await conn.run_sync(SQLModel.metadata.drop_all)
@@ -1,28 +1,40 @@
-from typing import Annotated
+from typing import Annotated, Literal
 from datetime import timedelta
 from contextlib import asynccontextmanager
+import csv
+import hashlib
+import io
+import re
+from collections import Counter, defaultdict
 
-from fastapi import FastAPI, Form, Request, HTTPException, Query, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+import orjson
+
+from fastapi import FastAPI, Form, Request, Response, HTTPException, Query, Depends
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi.encoders import jsonable_encoder
 
-from sqlmodel import select
+from sqlmodel import select, update, delete, insert
+from sqlalchemy import not_, case, func, text, table, column, literal_column
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import *
 from app.models import *
 from app.schemas import *
-from app.database import SessionDep, engine, create_db_and_tables
+from app.database import SessionDep, engine, create_db_and_tables, get_pool_status, SEARCH_CONFIG, SQLITE_SEARCH_TABLE
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    create_db_and_tables()
+    await create_db_and_tables()
 
     yield
     
-    engine.dispose() 
+    await engine.dispose() 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 def check_access_to_task(user: User, task: Task):
     if task.user_id != user.id:
@@ -31,30 +43,378 @@ def check_access_to_task(user: User, task: Task):
             detail=f"User with id={user.id} do not have access to the task with id={task.id}"
         )
 
-def get_task_by_id(session: SessionDep, task_id: int) -> Task | None:
-    task = session.exec(select(Task).where(Task.id == task_id)).first()
+def check_task_content_length(user: User, contents: list[str]):
+    max_letters = settings.MAX_LETERS_ADMIN if user.is_admin else settings.MAX_LETERS_USER
+    if any(len(tc) > max_letters for tc in contents):
+        raise HTTPException(
+            status_code = 422,
+            detail      = f"Content for the Task is too long, {'an admin' if user.is_admin else 'a user'} can use at most {max_letters} letters per task"
+        )
+
+async def get_task_by_id(session: SessionDep, task_id: int) -> Task | None:
+    task = (await session.exec(select(Task).where(Task.id == task_id))).first()
     return task
 
-def delete_task(session: SessionDep, task: Task) -> bool:
-    session.delete(task)
-    session.commit()
-    return 0
+async def record_tasks_write(session: SessionDep, user_id: int, total: int = 0, complete: int = 0):
+    """Moves the user's tasks version on and applies the counter changes,
+    inside the transaction of the write itself."""
+    dialect_insert = postgresql_insert if session.get_bind().dialect.name == "postgresql" else sqlite_insert
+    await session.exec(
+        dialect_insert(TaskStats)
+        .values(user_id=user_id, version=1, total=total, complete=complete)
+        .on_conflict_do_update(index_elements=[TaskStats.user_id], set_={
+            "version":  TaskStats.version + 1,
+            "total":    TaskStats.total + total,
+            "complete": TaskStats.complete + complete,
+        })
+    )
+    # pages of the old version could not be served anymore, they only take up room
+    listing_cache.invalidate(user_id)
+
+async def get_task_stats(session: SessionDep, user_id: int) -> TaskStats:
+    # users who never wrote have no row yet
+    return await session.get(TaskStats, user_id) or TaskStats(user_id=user_id)
+
+def tasks_etag(request: Request, user: User, version: int) -> str:
+    # one version covers all of the user's tasks, the url tells apart the
+    # representations (task id, filters, page) built from it
+    digest = hashlib.blake2b(f"{request.url.path}?{request.url.query}".encode(), digest_size=8).hexdigest()
+    return f'"{user.id}-{version}-{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+def etag_headers(etag: str) -> dict:
+    # clients may keep the response but have to revalidate it on every use
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+async def create_user_tasks(session: SessionDep, requests: list[tuple[int, list[str]]]) -> list[list[dict]]:
+    """Inserts the tasks of one or more (user_id, contents) requests with multi-row
+    INSERT ... RETURNING statements and a single commit, returns the created
+    tasks of every request."""
+    rows = [
+        {
+            "user_id":      user_id,
+            "task_content": tc,
+            "is_complete":  False,
+        }
+        for user_id, contents in requests
+        for tc in contents
+    ]
+
+    if session.get_bind().dialect.insert_executemany_returning:
+        # owner and content are returned along with the id, so rows can be paired without
+        # asking for ordered RETURNING, which SQLite only serves one row at a time
+        statement = insert(Task).returning(Task.id, Task.user_id, Task.task_content)
+        returned  = (await session.exec(statement, params=rows)).all()
+    else:
+        # no RETURNING (e.g. SQLite < 3.35): the ORM flush inserts row by row
+        # and reads each id from the cursor, still without extra SELECTs
+        new_tasks = [Task(**row) for row in rows]
+        session.add_all(new_tasks)
+        await session.flush()
+        returned  = [(task.id, task.user_id, task.task_content) for task in new_tasks]
+
+    created = Counter(user_id for user_id, contents in requests for _ in contents)
+    for user_id, count in created.items():
+        await record_tasks_write(session, user_id, total=count)
+    await session.commit()
+
+    # tasks with the same owner and content are interchangeable, every
+    # request takes the lowest of the ids left for its own
+    free_ids = defaultdict(list)
+    for task_id, user_id, task_content in sorted(returned, reverse=True):
+        free_ids[(user_id, task_content)].append(task_id)
+
+    results = []
+    for user_id, contents in requests:
+        tasks = [
+            {
+                "user_id":      user_id,
+                "task_content": tc,
+                "is_complete":  False,
+                "id":           free_ids[(user_id, tc)].pop(),
+            }
+            for tc in contents
+        ]
+        results.append(sorted(tasks, key=lambda task: task["id"]))
+    return results
+
+async def create_tasks(session: SessionDep, user: User, contents: list[str]) -> list[dict]:
+    return (await create_user_tasks(session, [(user.id, contents)]))[0]
+
+async def flush_task_inserts(batch: list[tuple]) -> list[list[dict]]:
+    """Writes the coalesced /post/ requests, one transaction per engine."""
+    results = [None] * len(batch)
+    by_bind = defaultdict(list)
+    for position, (bind, user_id, contents) in enumerate(batch):
+        by_bind[bind].append(position)
+
+    for bind, positions in by_bind.items():
+        async with AsyncSession(bind, expire_on_commit=False) as session:
+            created = await create_user_tasks(session, [batch[position][1:] for position in positions])
+        for position, tasks in zip(positions, created):
+            results[position] = tasks
+    return results
+
+task_insert_coalescer = WriteCoalescer(
+    flush_task_inserts,
+    max_delay = settings.POST_COALESCE_MAX_DELAY_MS / 1000,
+    max_batch = settings.POST_COALESCE_MAX_BATCH,
+)
+
+async def apply_task_operations(session: SessionDep, user: User, operations: list[TaskOperation]) -> list[dict]:
+    """Checks ownership of every id with one query, then applies all switches,
+    changes and deletes with one statement each and a single commit."""
+    task_ids = [operation.id for operation in operations]
+    owners   = dict((await session.exec(select(Task.id, Task.user_id).where(Task.id.in_(task_ids)))).all())
+    allowed  = [operation for operation in operations if owners.get(operation.id) == user.id]
+
+    switch_ids  = [operation.id for operation in allowed if operation.op == "switch"]
+    new_content = {operation.id: operation.task_content for operation in allowed if operation.op == "change"}
+    delete_ids  = [operation.id for operation in allowed if operation.op == "delete"]
+
+    if switch_ids:
+        await session.exec(
+            update(Task)
+            .where(Task.id.in_(switch_ids), Task.user_id == user.id)
+            .values(is_complete=not_(Task.is_complete))
+            .execution_options(synchronize_session=False)
+        )
+    if new_content:
+        await session.exec(
+            update(Task)
+            .where(Task.id.in_(new_content), Task.user_id == user.id)
+            .values(task_content=case(new_content, value=Task.id))
+            .execution_options(synchronize_session=False)
+        )
+    deleted = await delete_owned_tasks(session, user, delete_ids) if delete_ids else []
     
-def change_task(session: SessionDep,  task: Task, new_content: str) -> Task:
-    task.task_content = new_content
-    session.commit()
-    session.refresh(task)
-    return task
+    updated = {}
+    if switch_ids or new_content:
+        rows    = (await session.exec(select(*TASK_COLUMNS).where(Task.id.in_([*switch_ids, *new_content])))).all()
+        updated = {row.id: row for row in rows}
+    if allowed:
+        switched = [updated[task_id].is_complete for task_id in switch_ids if task_id in updated]
+        await record_tasks_write(
+            session, user.id,
+            total    = -len(deleted),
+            complete = sum(1 if is_complete else -1 for is_complete in switched) - sum(is_complete for _, is_complete in deleted)
+        )
+    await session.commit()
+
+    deleted_ids = {task_id for task_id, _ in deleted}
+    results = []
+    for operation in operations:
+        result = {"op": operation.op, "id": operation.id}
+        if operation.id not in owners:
+            result.update(status=404, detail=f"Task with id={operation.id} not found")
+        elif owners[operation.id] != user.id:
+            result.update(status=403, detail=f"User with id={user.id} do not have access to the task with id={operation.id}")
+        elif operation.id not in (deleted_ids if operation.op == "delete" else updated):
+            # deleted by another request between the ownership check and the write
+            result.update(status=404, detail=f"Task with id={operation.id} not found")
+        elif operation.op == "delete":
+            result.update(status=200)
+        else:
+            task = updated[operation.id]
+            result.update(status=200, task={
+                "user_id":      task.user_id,
+                "task_content": task.task_content,
+                "complete":     task.is_complete,
+                "id":           task.id,
+            })
+        results.append(result)
+    return results
+
+def tasks_listing_statement(user: User, only_complete: bool | None, only_uncomplete: bool | None):
+    # only the listed columns are selected, rows come back as plain tuples
+    # without building Task objects
+    statement = (
+        (
+            select(Task.id, Task.task_content, Task.is_complete)
+            .where(Task.user_id == user.id)
+            .order_by(Task.id)
+        )
+    )
+
+    if only_complete:     statement = statement.where(Task.is_complete == True)                            
+    elif only_uncomplete: statement = statement.where(Task.is_complete == False)
+    return statement
+
+SQLITE_SEARCH = table(SQLITE_SEARCH_TABLE, column("rowid"))
+
+def tasks_search_statement(dialect_name: str, user: User, terms: list[str], only_complete: bool | None, only_uncomplete: bool | None):
+    """The listing statement narrowed to tasks containing every term, best matches first."""
+    statement = tasks_listing_statement(user, only_complete, only_uncomplete).order_by(None)
+
+    if dialect_name == "sqlite":
+        # terms are quoted so they never read as FTS5 operators, user_id
+        # restricts the match to the user's own postings
+        words = " ".join(f'"{term}"' for term in terms)
+        match = f'user_id : "{user.id}" AND task_content : ({words})'
+        return (
+            statement
+            .join(SQLITE_SEARCH, SQLITE_SEARCH.c.rowid == Task.id)
+            .where(text(f"{SQLITE_SEARCH_TABLE} MATCH :match").bindparams(match=match))
+            .order_by(text(f"bm25({SQLITE_SEARCH_TABLE}, 1.0, 0.0)"), Task.id)
+        )
+
+    if dialect_name == "postgresql":
+        # same expression as the GIN index, so the index serves the match
+        document = func.to_tsvector(literal_column(f"'{SEARCH_CONFIG}'"), Task.task_content)
+        query    = func.plainto_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), " ".join(terms))
+        return statement.where(document.op("@@")(query)).order_by(func.ts_rank(document, query).desc(), Task.id)
+
+    for term in terms:
+        statement = statement.where(Task.task_content.contains(term, autoescape=True))
+    return statement.order_by(Task.id)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv":    "text/csv",
+}
+
+async def stream_tasks(bind, statement, user_id: int, export_format: str):
+    """Yields the listing chunk by chunk from a server-side cursor, so memory
+    stays flat however many tasks the user has.
+
+    The request session is closed before a streamed body is sent, so rows
+    are read through a session of its own on the same engine."""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["id", "user_id", "task_content", "is_complete"])
+        yield buffer.getvalue()
+
+    async with AsyncSession(bind) as session:
+        result = await session.stream(statement.execution_options(yield_per=settings.STREAM_BATCH_SIZE))
+        async for rows in result.partitions():
+            if export_format == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows((task_id, user_id, task_content, is_complete) for task_id, task_content, is_complete in rows)
+                yield buffer.getvalue()
+            else:
+                yield b"".join(
+                    orjson.dumps({"task_content": task_content, "is_complete": is_complete, "user_id": user_id, "id": task_id}) + b"\n"
+                    for task_id, task_content, is_complete in rows
+                )
+
+async def get_tasks_by_ids_for_user(session: SessionDep, user: User, task_ids: list[int]) -> dict[int, dict]:
+    rows = (await session.exec(
+        select(*TASK_COLUMNS)
+        .where(Task.id.in_(task_ids), Task.user_id == user.id)
+    )).all()
+    return {
+        task_id: {
+            "id":           task_id,
+            "user_id":      user_id,
+            "task_content": task_content,
+            "is_complete":  is_complete,
+        }
+        for task_id, user_id, task_content, is_complete in rows
+    }
+
+def parse_task_ids(ids: str) -> list[int]:
+    """Parses "1,2,3" into unique ids keeping their order, 422 on anything else."""
+    try:
+        task_ids = list(dict.fromkeys(int(task_id) for task_id in ids.split(",") if task_id.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code = 422,
+            detail      = f"Unprocessable queries: ids must be comma separated integers, got '{ids}'. For more info visit /help/"
+        )
+    
+    if not task_ids:
+        raise HTTPException(
+            status_code = 422,
+            detail      = "Unprocessable queries: no task ids were given. For more info visit /help/"
+        )
     
-def switch_task(session: SessionDep,  task: Task) -> Task:
-    task.is_complete = not task.is_complete
-    session.commit()
-    session.refresh(task)
+    if len(task_ids) > settings.MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code = 422,
+            detail      = f"Unprocessable queries: at most {settings.MAX_BATCH_IDS} task ids can be given at once. For more info visit /help/"
+        )
+    
+    return task_ids
+
+async def delete_owned_tasks(session: SessionDep, user: User, task_ids: list[int]) -> list[tuple[int, bool]]:
+    """Single DELETE scoped to the owner, returns (id, is_complete) of the rows
+    which were actually deleted."""
+    statement = (
+        delete(Task)
+        .where(Task.user_id == user.id, Task.id.in_(task_ids))
+        .execution_options(synchronize_session=False)
+    )
+
+    if session.get_bind().dialect.delete_returning:
+        return (await session.exec(statement.returning(Task.id, Task.is_complete))).all()
+
+    deleted = (await session.exec(select(Task.id, Task.is_complete).where(Task.user_id == user.id, Task.id.in_(task_ids)))).all()
+    await session.exec(statement)
+    return deleted
+
+async def delete_tasks(session: SessionDep, user: User, task_ids: list[int]) -> list[int]:
+    deleted = await delete_owned_tasks(session, user, task_ids)
+    if deleted:
+        await record_tasks_write(session, user.id, total=-len(deleted), complete=-sum(is_complete for _, is_complete in deleted))
+    await session.commit()
+    return [task_id for task_id, _ in deleted]
+    
+async def raise_task_not_available(session: SessionDep, user: User, task_id: int):
+    # only reached when an ownership-scoped statement matched nothing
+    owner_id = (await session.exec(select(Task.user_id).where(Task.id == task_id))).first()
+    if owner_id is None:
+        raise HTTPException(
+            status_code = 404,
+            detail      = f"Task with id={task_id} not found"
+        )
+    
+    raise HTTPException(
+        status_code=403,
+        detail=f"User with id={user.id} do not have access to the task with id={task_id}"
+    )
+
+TASK_COLUMNS = (Task.id, Task.user_id, Task.task_content, Task.is_complete)
+
+async def update_task(session: SessionDep, user: User, task_id: int, **values):
+    """Single UPDATE scoped to the owner, returns the updated row or None
+    when the task does not exist or belongs to another user."""
+    statement = (
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == user.id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+    if session.get_bind().dialect.update_returning:
+        task = (await session.exec(statement.returning(*TASK_COLUMNS))).first()
+    else:
+        result = await session.exec(statement)
+        task   = (await session.exec(select(*TASK_COLUMNS).where(Task.id == task_id))).first() if result.rowcount else None
+
+    if task is not None:
+        # is_complete is only ever updated by switching it
+        complete = (1 if task.is_complete else -1) if "is_complete" in values else 0
+        await record_tasks_write(session, user.id, complete=complete)
+    await session.commit()
     return task
     
+async def change_task(session: SessionDep, user: User, task_id: int, new_content: str):
+    return await update_task(session, user, task_id, task_content=new_content)
+    
+async def switch_task(session: SessionDep, user: User, task_id: int):
+    # toggled inside the statement, so concurrent switches never lose an update
+    return await update_task(session, user, task_id, is_complete=not_(Task.is_complete))
+    
 # Endpoints section
 
-@app.get("/help/", status_code=200, response_class=JSONResponse)
+@app.get("/help/", status_code=200, response_class=ORJSONResponse)
 async def return_help_info():
     return {
         "Endpoints Available Query Parameters" : [
@@ -64,6 +424,24 @@ async def return_help_info():
                     "only_uncomplete": "bool",
                     "limit": "int",
                     "page": "int",  
+                    "after_id": "int",
+                    "stream": "bool",
+                },
+            },
+            {
+                "/search/": {
+                    "q": "str, words the tasks have to contain",
+                    "only_complete": "bool",
+                    "only_uncomplete": "bool",
+                    "limit": "int",
+                    "page": "int",
+                },
+            },
+            {
+                "/export/": {
+                    "format": "ndjson | csv",
+                    "only_complete": "bool",
+                    "only_uncomplete": "bool",
                 },
             },
             {
@@ -71,6 +449,11 @@ async def return_help_info():
                     "task_id": "int",  
                 },
             },  
+            {
+                "/get/": {
+                    "ids": "str, comma separated task ids",  
+                },
+            },  
             {
                 "/post/": {
                     "task_content": "list[str]",  
@@ -81,6 +464,11 @@ async def return_help_info():
                     "task_id": "int",  
                 },
             },  
+            {
+                "/delete/": {
+                    "ids": "str, comma separated task ids",  
+                },
+            },  
             {
                 "/change/{task_id}/": {
                     "task_id": "int",
@@ -93,6 +481,29 @@ async def return_help_info():
                     "complete_val": "bool",
                 },
             },  
+            {
+                "/batch/ (POST)": {
+                    "operations": "list[{op: switch | change | delete, id: int, task_content: str}]",
+                },
+            },  
+            {
+                "/stats/": {
+                    "description": "How many tasks the user has in total, complete and incomplete",
+                    "params": "None"
+                },
+            },
+            {
+                "/metrics": {
+                    "description": "Request counts, latency histograms and pool/cache metrics in Prometheus text format",
+                    "params": "None"
+                },
+            },
+            {
+                "/metrics/pool/": {
+                    "description": "Database connection pool usage and checkout wait times",
+                    "params": "None"
+                },
+            },
             {
                 "/logout/": {
                     "description": "Clears the access token cookie and redirects to /login/",
@@ -102,6 +513,41 @@ async def return_help_info():
         ]        
     }
 
+def render_metrics(bind) -> str:
+    pool  = get_pool_status(bind)
+    lines = request_metrics.render()
+    lines += format_metric("db_pool_checked_out", "gauge", "Database connections currently checked out.", [({}, pool.get("checked_out", 0))])
+    lines += format_metric("db_pool_overflow", "gauge", "Database connections opened above pool_size.", [({}, pool.get("overflow", 0))])
+    lines += format_metric("db_pool_checkouts_total", "counter", "Database connection checkouts.", [({}, pool["checkouts"])])
+    lines += format_metric("db_pool_timeouts_total", "counter", "Checkouts which gave up after pool_timeout.", [({}, pool["timeouts"])])
+    lines += format_metric("db_pool_wait_seconds_total", "counter", "Time spent waiting for a pooled connection.", [({}, pool["wait_seconds_total"])])
+    lines += format_metric("password_pool_in_flight", "gauge", "Password hash/verify calls queued or running.", [({}, password_pool_stats["in_flight"])])
+    lines += format_metric("password_pool_rejected_total", "counter", "Password calls refused with 503.", [({}, password_pool_stats["rejected"])])
+    lines += format_metric("password_pool_wait_seconds_total", "counter", "Time password calls waited for a worker.", [({}, password_pool_stats["wait_seconds_total"])])
+    lines += format_metric("user_cache_requests_total", "counter", "User cache lookups by result.", [
+        ({"result": "hit"},  user_cache.stats["hits"]),
+        ({"result": "miss"}, user_cache.stats["misses"]),
+    ])
+    lines += task_insert_coalescer.render("post_coalesced_batch_rows", "Tasks written per coalesced /post/ transaction.")
+    lines += format_metric("post_coalesced_requests_total", "counter", "/post/ requests written through the coalescer.", [({}, task_insert_coalescer.stats["items"])])
+    lines += format_metric("listing_cache_requests_total", "counter", "Listing cache lookups by result.", [
+        ({"result": "hit"},  listing_cache.stats["hits"]),
+        ({"result": "miss"}, listing_cache.stats["misses"]),
+    ])
+    lines += format_metric("listing_cache_evictions_total", "counter", "Listing pages evicted to stay within the caps.", [({}, listing_cache.stats["evictions"])])
+    lines += format_metric("listing_cache_invalidations_total", "counter", "Listing pages dropped after their tasks changed.", [({}, listing_cache.stats["invalidations"])])
+    lines += format_metric("listing_cache_entries", "gauge", "Listing pages currently cached.", [({}, len(listing_cache.entries))])
+    lines += format_metric("listing_cache_bytes", "gauge", "Size of the cached listing pages.", [({}, listing_cache.size)])
+    return "\n".join(lines) + "\n"
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(session: SessionDep):
+    return PlainTextResponse(render_metrics(session.bind), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/pool/", status_code=200)
+async def get_database_pool_status(session: SessionDep):
+    return get_pool_status(session.bind)
+
 @app.get("/login/", response_class=HTMLResponse)
 async def give_login_page(request: Request):
     return """
@@ -118,12 +564,12 @@ async def give_login_page(request: Request):
         <a href="/register/">Go to a Registration page</a>
     """
 
-@app.post("/login/", response_class=JSONResponse)
+@app.post("/login/", response_class=ORJSONResponse)
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: SessionDep
 ):
-    user = authenticate_user(session, form_data.username, form_data.password)
+    user = await authenticate_user(session, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=401,
@@ -183,13 +629,13 @@ async def registration(
         is_admin: Annotated[bool, Form()] = False,
     ):
     
-    if (get_user(session, username)):
+    if (await get_user(session, username)):
         raise HTTPException(
             status_code = 409,
             detail      = f"Username {username} is already taken"
         )
     
-    hashed_password = get_hash_password(password)
+    hashed_password = await get_hash_password_in_pool(password)
     new_user = User(
         username        = username,
         hashed_password = hashed_password,
@@ -197,8 +643,8 @@ async def registration(
         is_disable      = False
     )
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
+    await session.refresh(new_user)
 
     new_user_pub: UserPublic = UserPublic(**new_user.model_dump(exclude={"hashed_password"}))
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -212,8 +658,8 @@ async def registration(
     else:
         pref = "User"
     
-    response = JSONResponse({"messsage": f"{pref} {new_user_pub.username} was created successfully",
-                             "user": new_user_pub.model_dump()})
+    response = ORJSONResponse({"messsage": f"{pref} {new_user_pub.username} was created successfully",
+                               "user": new_user_pub.model_dump()})
     response.set_cookie(
         key      = "access_token",
         value    = access_token,
@@ -224,14 +670,24 @@ async def registration(
     )
     return response
 
-@app.get("/get/{task_id}", status_code=200, response_class=JSONResponse)
+@app.get("/get/{task_id}", status_code=200, response_class=ORJSONResponse)
 async def get_task(
+        request: Request,
         user:    UserDep, 
         session: SessionDep, 
         task_id: int
     ):
     
-    task = get_task_by_id(session, task_id)
+    etag = tasks_etag(request, user, (await get_task_stats(session, user.id)).version)
+    if etag_matches(request, etag):
+        # tags are predictable, the task has to exist and be the user's own
+        # before it can be reported unchanged
+        owned = (await session.exec(select(Task.id).where(Task.id == task_id, Task.user_id == user.id))).first()
+        if owned is None:
+            await raise_task_not_available(session, user, task_id)
+        return Response(status_code=304, headers=etag_headers(etag))
+
+    task = await get_task_by_id(session, task_id)
     if not task:
         raise HTTPException(
             status_code = 404,
@@ -240,18 +696,41 @@ async def get_task(
 
     check_access_to_task(user, task)
 
-    return {
+    return ORJSONResponse({
         "task": task.model_dump()
-    }
+    }, headers=etag_headers(etag))
+
+@app.get("/get/", status_code=200, response_class=ORJSONResponse)
+async def get_tasks_by_ids(
+        user:    UserDep, 
+        session: SessionDep, 
+        ids:     str = Query(..., description="Comma separated ids of tasks to fetch")
+    ):
+    
+    task_ids = parse_task_ids(ids)
+    tasks    = await get_tasks_by_ids_for_user(session, user, task_ids)
+
+    # ids of other users' tasks are told apart from missing ones only when needed
+    unmatched = [task_id for task_id in task_ids if task_id not in tasks]
+    existing  = set((await session.exec(select(Task.id).where(Task.id.in_(unmatched)))).all()) if unmatched else set()
+
+    return ORJSONResponse({
+        "tasks":     [tasks[task_id] for task_id in task_ids if task_id in tasks],
+        "missing":   [task_id for task_id in unmatched if task_id not in existing],
+        "forbidden": [task_id for task_id in unmatched if task_id in existing],
+    })
 
-@app.get("/", status_code=200, response_class=JSONResponse)
+@app.get("/", status_code=200, response_class=ORJSONResponse)
 async def get_all_users_tasks(
+        request:         Request,
         user:            UserDep,
         session:         SessionDep,
         only_complete:   Annotated[bool | None, Query(..., description = "Sorting tasks by complete val == true")] = None,
         only_uncomplete: Annotated[bool | None, Query(..., description = "Sorting tasks by complete val == false")] = None,
         limit:           Annotated[int  | None, Query(..., description = "Limit for amount of tasks in one page")] = None,
         page:            Annotated[int  | None, Query(..., description = "Page number of tasks")] = 1,
+        after_id:        Annotated[int  | None, Query(..., description = "Return tasks with id greater than this cursor (keyset pagination)")] = None,
+        stream:          Annotated[bool,        Query(..., description = "Stream tasks as NDJSON instead of one JSON document")] = False,
     ):
 
     if only_complete and only_uncomplete:
@@ -266,32 +745,150 @@ async def get_all_users_tasks(
             detail      = "Unprocessable queries: cannot generate response when amount of tasks in page limit = 0. For more info visit /help/"
         )
 
-    statement = (
-        (
-            select(Task)
-            .where(Task.user_id == user.id)
+    if after_id is not None and page != 1:
+        raise HTTPException(
+            status_code = 422,
+            detail      = "Unprocessable queries: cannot generate response when both page and after_id are given. For more info visit /help/"
         )
-    )
 
-    if only_complete:     statement = statement.where(Task.is_complete == True)                            
-    elif only_uncomplete: statement = statement.where(Task.is_complete == False)
+    # the version is read before the listing, so the body is never older than its ETag
+    stats = await get_task_stats(session, user.id)
+    etag  = tasks_etag(request, user, stats.version)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=etag_headers(etag))
+
+    cache_query = (only_complete, only_uncomplete, limit, page, after_id)
+    if settings.LISTING_CACHE_ENABLED and not stream:
+        body = listing_cache.get(user.id, stats.version, cache_query)
+        if body is not None:
+            return Response(body, media_type="application/json", headers=etag_headers(etag))
+
+    statement = tasks_listing_statement(user, only_complete, only_uncomplete)
     
-    if limit: 
+    if after_id is not None:
+        statement = statement.where(Task.id > after_id)
+        if limit:
+            statement = statement.limit(limit=limit)
+    elif limit: 
         offset    = (page - 1) * limit
         statement = statement.offset(offset=offset).limit(limit=limit)
+    
+    if stream:
+        return StreamingResponse(
+            stream_tasks(session.bind, statement, user.id, "ndjson"),
+            media_type = EXPORT_MEDIA_TYPES["ndjson"],
+            headers    = etag_headers(etag)
+        )
         
-    tasks_table = session.exec(statement).all()
+    tasks_table = (await session.exec(statement)).all()
 
     generated_res = [
         {
-            "task_content": task.task_content,
-            "is_complete":  task.is_complete,   
+            "task_content": task_content,
+            "is_complete":  is_complete,   
             "user_id":      user.id,
-            "id" :          task.id
+            "id" :          task_id
            }
-        for task in tasks_table
+        for task_id, task_content, is_complete in tasks_table
         ]
-    return {"tasks": jsonable_encoder(generated_res)}
+    
+    # values are already JSON types, so the response is rendered by orjson directly
+    # instead of going through the encoder again
+    content = {"tasks": generated_res}
+    if after_id is not None:
+        # a full page means there may be more rows after the last id
+        content["next_cursor"] = tasks_table[-1].id if limit and len(tasks_table) == limit else None
+    if limit:
+        # taken from the counters row read for the ETag, so page counts cost no COUNT(*)
+        if only_complete:     content["total"] = stats.complete
+        elif only_uncomplete: content["total"] = stats.total - stats.complete
+        else:                 content["total"] = stats.total
+
+    response = ORJSONResponse(content, headers=etag_headers(etag))
+
+    if settings.LISTING_CACHE_ENABLED:
+        listing_cache.set(user.id, stats.version, cache_query, response.body)
+    return response
+
+@app.get("/search/", status_code=200, response_class=ORJSONResponse)
+async def search_tasks(
+        user:            UserDep,
+        session:         SessionDep,
+        q:               Annotated[str,         Query(..., description = "Words the tasks have to contain")],
+        only_complete:   Annotated[bool | None, Query(..., description = "Sorting tasks by complete val == true")] = None,
+        only_uncomplete: Annotated[bool | None, Query(..., description = "Sorting tasks by complete val == false")] = None,
+        limit:           Annotated[int  | None, Query(..., description = "Limit for amount of tasks in one page")] = None,
+        page:            Annotated[int  | None, Query(..., description = "Page number of tasks")] = 1,
+    ):
+
+    if only_complete and only_uncomplete:
+        raise HTTPException(
+            status_code = 422,
+            detail      = "Unprocessable queries: cannot generate response when only_complete and only_uncomplete == True. For more info visit /help/"
+        )
+    
+    if limit == 0:
+        raise HTTPException(
+            status_code = 422,
+            detail      = "Unprocessable queries: cannot generate response when amount of tasks in page limit = 0. For more info visit /help/"
+        )
+
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        raise HTTPException(
+            status_code = 422,
+            detail      = "Unprocessable queries: q has to contain at least one word. For more info visit /help/"
+        )
+
+    statement = tasks_search_statement(session.get_bind().dialect.name, user, terms, only_complete, only_uncomplete)
+    if limit:
+        statement = statement.offset(offset=(page - 1) * limit).limit(limit=limit)
+
+    tasks_table = (await session.exec(statement)).all()
+    return ORJSONResponse({"tasks": [
+        {
+            "task_content": task_content,
+            "is_complete":  is_complete,
+            "user_id":      user.id,
+            "id":           task_id
+        }
+        for task_id, task_content, is_complete in tasks_table
+    ]})
+
+@app.get("/stats/", status_code=200, response_class=ORJSONResponse)
+async def get_tasks_stats(
+        user:    UserDep,
+        session: SessionDep,
+    ):
+
+    stats = await get_task_stats(session, user.id)
+    return ORJSONResponse({
+        "total":      stats.total,
+        "complete":   stats.complete,
+        "incomplete": stats.total - stats.complete,
+    })
+
+@app.get("/export/", status_code=200)
+async def export_tasks(
+        user:            UserDep,
+        session:         SessionDep,
+        export_format:   Annotated[Literal["ndjson", "csv"], Query(alias="format", description = "Export format")] = "ndjson",
+        only_complete:   Annotated[bool | None, Query(..., description = "Sorting tasks by complete val == true")] = None,
+        only_uncomplete: Annotated[bool | None, Query(..., description = "Sorting tasks by complete val == false")] = None,
+    ):
+
+    if only_complete and only_uncomplete:
+        raise HTTPException(
+            status_code = 422,
+            detail      = "Unprocessable queries: cannot generate response when only_complete and only_uncomplete == True. For more info visit /help/"
+        )
+
+    statement = tasks_listing_statement(user, only_complete, only_uncomplete)
+    return StreamingResponse(
+        stream_tasks(session.bind, statement, user.id, export_format),
+        media_type = EXPORT_MEDIA_TYPES[export_format],
+        headers    = {"Content-Disposition": f"attachment; filename=tasks.{export_format}"}
+    )
 
 @app.get("/post/", status_code=201)
 async def post_tasks(
@@ -309,25 +906,22 @@ async def post_tasks(
             detail      = "Content for the Task was not given"
         )
     
-    new_tasks = [
-        Task(
-            id           = None,
-            is_complete  = False,
-            user_id      = user.id,
-            task_content = tc
-        )
-        for tc in task_content
-    ]
+    check_task_content_length(user, task_content)
     
-    session.add_all(new_tasks)
-    session.commit()
-    for task in new_tasks:
-        session.refresh(task)
+    if settings.POST_COALESCING_ENABLED:
+        # the batch is written through a session of its own. The request session may
+        # hold a pooled connection from loading the user, it is given back before
+        # waiting, or a full pool of waiting requests would starve the flush
+        bind = session.bind
+        await session.close()
+        new_tasks = await task_insert_coalescer.submit((bind, user.id, task_content), rows=len(task_content))
+    else:
+        new_tasks = await create_tasks(session, user, task_content)
 
-    return {
+    return ORJSONResponse({
         "message": f"{len(task_content)} tasks created successfully",
-        "tasks":   [task.model_dump() for task in new_tasks]
-    }
+        "tasks":   new_tasks
+    }, status_code=201)
 
 
 @app.get("/delete/{task_id}", status_code=200)
@@ -337,17 +931,27 @@ async def delete_task_by_id(
         task_id: int
     ):
 
-    task = get_task_by_id(session, task_id)
-    if not task:
-        raise HTTPException(
-            status_code = 404,
-            detail      = f"Task with id={task_id} not found"
-        )
-    
-    check_access_to_task(user, task)
+    if not await delete_tasks(session, user, [task_id]):
+        await raise_task_not_available(session, user, task_id)
+
+    return ORJSONResponse({"message": f"Task with id={task_id} deleted successfuly"})    
+
+@app.get("/delete/", status_code=200)
+async def delete_tasks_by_ids(
+        user:    UserDep,
+        session: SessionDep, 
+        ids:     str = Query(..., description="Comma separated ids of tasks to delete")
+    ):
 
-    delete_task(session, task)
-    return {"message": f"Task with id={task_id} deleted successfuly"}    
+    task_ids    = parse_task_ids(ids)
+    deleted_ids = await delete_tasks(session, user, task_ids)
+    deleted     = set(deleted_ids)
+    return ORJSONResponse({
+        "message":     f"{len(deleted_ids)} tasks deleted successfuly",
+        "deleted":     sorted(deleted),
+        # ids which do not exist or belong to another user
+        "not_deleted": [task_id for task_id in task_ids if task_id not in deleted],
+    })
             
 
 @app.get("/change/{task_id}/", status_code=200)
@@ -358,16 +962,13 @@ async def change_task_by_id(
         task_content: str = Query(..., description="Content for a task object")
     ):
 
-    task = get_task_by_id(session, task_id)
-    if not task:
-        raise HTTPException(
-            status_code = 404,
-            detail      = f"Task with id={task_id} not found"
-        )
-    
-    check_access_to_task(user, task)
-    new_task = change_task(session, task, task_content)
-    return {
+    check_task_content_length(user, [task_content])
+
+    new_task = await change_task(session, user, task_id, task_content)
+    if new_task is None:
+        await raise_task_not_available(session, user, task_id)
+
+    return ORJSONResponse({
         "message": "Task chenged successfully",
         "task":    {
             "user_id":      new_task.user_id,
@@ -375,7 +976,7 @@ async def change_task_by_id(
             "complete":     new_task.is_complete,
             "id":           new_task.id,
         }
-    }
+    })
     
 @app.get("/switch/{task_id}/", status_code=200)
 async def switch_task_by_id(
@@ -384,16 +985,11 @@ async def switch_task_by_id(
         task_id: int, 
     ):
     
-    task = get_task_by_id(session, task_id)
-    if not task:
-        raise HTTPException(
-            status_code = 404,
-            detail      = f"Task with id={task_id} not found"
-        )
-    
-    check_access_to_task(user, task)
-    new_task = switch_task(session, task)
-    return {
+    new_task = await switch_task(session, user, task_id)
+    if new_task is None:
+        await raise_task_not_available(session, user, task_id)
+
+    return ORJSONResponse({
         "message": "Task complete field switched successfully",
         "task":    {
             "user_id":      new_task.user_id,
@@ -401,4 +997,38 @@ async def switch_task_by_id(
             "complete":     new_task.is_complete,
             "id":           new_task.id,
         }
-    }
\ No newline at end of file
+    })
+
+@app.post("/batch/", status_code=200)
+async def batch_tasks(
+        user:    UserDep,
+        session: SessionDep,
+        batch:   TaskBatch,
+    ):
+
+    task_ids = [operation.id for operation in batch.operations]
+    if not task_ids:
+        raise HTTPException(
+            status_code = 422,
+            detail      = "Unprocessable queries: no operations were given. For more info visit /help/"
+        )
+    
+    if len(task_ids) > settings.MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code = 422,
+            detail      = f"Unprocessable queries: at most {settings.MAX_BATCH_IDS} operations can be given at once. For more info visit /help/"
+        )
+    
+    if len(set(task_ids)) != len(task_ids):
+        raise HTTPException(
+            status_code = 422,
+            detail      = "Unprocessable queries: every task id can appear only once in a batch. For more info visit /help/"
+        )
+
+    check_task_content_length(user, [operation.task_content for operation in batch.operations if operation.op == "change"])
+
+    results = await apply_task_operations(session, user, batch.operations)
+    return ORJSONResponse({
+        "message": f"{sum(result['status'] == 200 for result in results)} of {len(results)} operations applied successfully",
+        "results": results,
+    })
\ No newline at end of file
@@ -1,4 +1,4 @@
 from .user import User
-from .task import Task
+from .task import Task, TaskStats
 
-__all__ = ["User", "Task"]
\ No newline at end of file
+__all__ = ["User", "Task", "TaskStats"]
\ No newline at end of file
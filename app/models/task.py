@@ -1,9 +1,32 @@
 # Task models
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, SQLModel, Index
+from sqlalchemy import text
 from typing import Optional
 
 class Task(SQLModel, table=True):
+    # (user_id, id) serves both the owner lookup and keyset pagination ordered by id,
+    # (user_id, is_complete, id) the same for listings filtered by completion.
+    # The partial index only keeps incomplete tasks, on backends supporting it
+    __table_args__ = (
+        Index("ix_task_user_id_id", "user_id", "id"),
+        Index("ix_task_user_id_is_complete_id", "user_id", "is_complete", "id"),
+        Index(
+            "ix_task_user_id_id_incomplete", "user_id", "id",
+            sqlite_where     = text("is_complete = 0"),
+            postgresql_where = text("is_complete = false"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, index=True, primary_key=True)
-    user_id: int = Field(index=True, foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id")
     task_content: str
-    is_complete: bool = False
\ No newline at end of file
+    is_complete: bool = False
+
+class TaskStats(SQLModel, table=True):
+    # One row per user, updated in the same transaction as every write to the
+    # user's tasks: the version turns into ETags and the counters answer
+    # "how many" without counting the task table
+    user_id:  int = Field(foreign_key="user.id", primary_key=True)
+    version:  int = 0
+    total:    int = 0
+    complete: int = 0
@@ -1,4 +1,4 @@
-from .task import TaskCreate, TaskUpdate
+from .task import TaskCreate, TaskUpdate, TaskOperation, TaskBatch
 from .user import UserCreate, UserUpdate, UserPublic
 
-__all__ = ["TaskCreate", "TaskUpdate", "UserCreate", "UserUpdate", "UserPublic"]
\ No newline at end of file
+__all__ = ["TaskCreate", "TaskUpdate", "TaskOperation", "TaskBatch", "UserCreate", "UserUpdate", "UserPublic"]
\ No newline at end of file
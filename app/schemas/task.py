@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, model_validator
+from typing import Optional, Literal
 
 class TaskCreate(BaseModel):
     user_id: int 
@@ -9,4 +9,18 @@ class TaskCreate(BaseModel):
 class TaskUpdate(BaseModel):
     id: int
     task_content: Optional[str] = None
-    is_complete: Optional[bool] = None
\ No newline at end of file
+    is_complete: Optional[bool] = None
+
+class TaskOperation(BaseModel):
+    op: Literal["switch", "change", "delete"]
+    id: int
+    task_content: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_content(self):
+        if self.op == "change" and self.task_content is None:
+            raise ValueError("task_content is required for a change operation")
+        return self
+
+class TaskBatch(BaseModel):
+    operations: list[TaskOperation]
\ No newline at end of file
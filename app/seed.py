@@ -0,0 +1,203 @@
+"""Bulk seeding of users and tasks for reproducing production-sized tables.
+
+    python -m app.seed --users 10000 --tasks-per-user 100
+
+Rows go in with batched executemany (COPY on PostgreSQL) and every user shares
+one precomputed password hash, so no bcrypt call is made per user.
+"""
+from contextlib import asynccontextmanager
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from sqlalchemy import select, func
+
+from app.core import settings, get_hash_password
+from app.database import create_app_engine, create_db_and_tables, SQLITE_SEARCH_TABLE, SQLITE_SEARCH_TRIGGERS
+from app.models import User, Task, TaskStats
+
+USER_COLUMNS = ("username", "hashed_password", "is_admin", "is_disabled")
+TASK_COLUMNS = ("user_id", "task_content", "is_complete")
+STATS_COLUMNS = ("user_id", "version", "total", "complete")
+
+class Progress:
+    """Single line progress report on stderr, redrawn at most every 0.2s."""
+
+    def __init__(self, total: int, stream=sys.stderr):
+        self.total   = total
+        self.done    = 0
+        self.stream  = stream
+        self.started = time.perf_counter()
+        self.drawn   = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.done / max(time.perf_counter() - self.started, 1e-9)
+
+    def advance(self, rows: int):
+        self.done += rows
+        now = time.perf_counter()
+        if now - self.drawn >= 0.2 or self.done >= self.total:
+            self.drawn = now
+            self.stream.write(f"\r{self.done:,}/{self.total:,} rows ({self.done / self.total:.0%}) {self.rate:,.0f} rows/s")
+            self.stream.flush()
+
+    def finish(self):
+        self.stream.write("\n")
+        self.stream.flush()
+
+async def insert_rows(conn, table, columns: tuple[str, ...], rows: list[tuple]):
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql":
+        # COPY straight through the asyncpg connection, the fastest way into postgres
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(table.name, records=rows, columns=columns)
+    elif conn.dialect.name == "sqlite":
+        # plain tuples through the driver's executemany, skipping per row parameter processing
+        preparer = conn.dialect.identifier_preparer
+        await conn.exec_driver_sql(
+            f"INSERT INTO {preparer.format_table(table)} ({', '.join(map(preparer.quote, columns))}) "
+            f"VALUES ({', '.join('?' * len(columns))})",
+            rows
+        )
+    else:
+        await conn.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+
+@asynccontextmanager
+async def batch_transaction(conn):
+    """Commits everything written inside as one transaction. COPY goes around
+    SQLAlchemy on the raw asyncpg connection, which is in autocommit outside of
+    a transaction of the driver's own, so one is opened there."""
+    if conn.dialect.name == "postgresql":
+        # asyncpg refuses a transaction() inside one the adapter already began
+        await conn.commit()
+        raw = await conn.get_raw_connection()
+        async with raw.driver_connection.transaction():
+            yield
+    else:
+        yield
+    await conn.commit()
+
+async def insert_tasks(conn, rows: list[tuple]):
+    if conn.dialect.name != "sqlite":
+        await insert_rows(conn, Task.__table__, TASK_COLUMNS, rows)
+        return
+
+    # the search trigger indexes row by row, FTS5 takes the whole batch in one
+    # statement many times faster. pysqlite would run the DROP TRIGGER in autocommit,
+    # so the transaction is opened explicitly: a failed or interrupted batch rolls
+    # the trigger back with it. IMMEDIATE takes the write lock up front, no other
+    # insert can slip in unindexed while the trigger is gone
+    raw = await conn.get_raw_connection()
+    if not raw.driver_connection.in_transaction:
+        await conn.exec_driver_sql("BEGIN IMMEDIATE")
+    last_id = (await conn.execute(select(func.max(Task.__table__.c.id)))).scalar() or 0
+    await conn.exec_driver_sql("DROP TRIGGER IF EXISTS task_fts_insert")
+    await insert_rows(conn, Task.__table__, TASK_COLUMNS, rows)
+    await conn.exec_driver_sql(
+        f"INSERT INTO {SQLITE_SEARCH_TABLE} (rowid, task_content, user_id) "
+        f"SELECT id, task_content, user_id FROM task WHERE id > ?",
+        (last_id,)
+    )
+    await conn.exec_driver_sql(SQLITE_SEARCH_TRIGGERS["task_fts_insert"])
+
+async def next_user_number(conn, prefix: str) -> int:
+    user_table = User.__table__
+    usernames  = (await conn.execute(
+        select(user_table.c.username).where(user_table.c.username.startswith(prefix, autoescape=True))
+    )).scalars()
+    numbers = [int(suffix) for suffix in (username[len(prefix):] for username in usernames) if suffix.isdigit()]
+    return max(numbers) + 1 if numbers else 0
+
+async def seed_database(
+        bind,
+        users:          int,
+        tasks_per_user: int,
+        password:       str   = "password",
+        prefix:         str   = "seed_user_",
+        batch_size:     int   = 50_000,
+        complete_ratio: float = 0.5,
+        seed:           int   = 0,
+        progress:       Progress | None = None,
+    ) -> int:
+    """Inserts users * (1 + tasks_per_user) rows along with the users' task
+    counters, returns how many users and tasks were written."""
+    rng             = random.Random(seed)
+    hashed_password = get_hash_password(password)
+    progress        = progress or Progress(users * (1 + tasks_per_user))
+
+    await create_db_and_tables(bind)
+
+    user_table  = User.__table__
+    stats_table = TaskStats.__table__
+    async with bind.connect() as conn:
+        last_id = (await conn.execute(select(func.max(user_table.c.id)))).scalar() or 0
+        # a later run grows the database, its users are numbered after the ones already there
+        first   = await next_user_number(conn, prefix)
+        for start in range(first, first + users, batch_size):
+            rows = [(f"{prefix}{number}", hashed_password, False, False) for number in range(start, min(start + batch_size, first + users))]
+            async with batch_transaction(conn):
+                await insert_rows(conn, user_table, USER_COLUMNS, rows)
+            progress.advance(len(rows))
+
+        user_ids = (await conn.execute(
+            select(user_table.c.id)
+            .where(user_table.c.id > last_id, user_table.c.username.startswith(prefix, autoescape=True))
+            .order_by(user_table.c.id)
+        )).scalars().all()
+
+        # the counters of a user go in with the user's last tasks, both always agree
+        rows, stats = [], []
+        for user_id in user_ids:
+            completes = [rng.random() < complete_ratio for _ in range(tasks_per_user)]
+            rows.extend((user_id, f"Task {number}", is_complete) for number, is_complete in enumerate(completes))
+            stats.append((user_id, 0, tasks_per_user, sum(completes)))
+            if len(rows) >= batch_size or user_id == user_ids[-1]:
+                async with batch_transaction(conn):
+                    await insert_tasks(conn, rows)
+                    await insert_rows(conn, stats_table, STATS_COLUMNS, stats)
+                progress.advance(len(rows))
+                rows, stats = [], []
+
+    return progress.done
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the database with generated users and tasks")
+    parser.add_argument("--users",          type=int, required=True)
+    parser.add_argument("--tasks-per-user", type=int, default=100)
+    parser.add_argument("--password",       default="password", help="password shared by every seeded user")
+    parser.add_argument("--prefix",         default="seed_user_", help="usernames are the prefix plus a number")
+    parser.add_argument("--batch-size",     type=int, default=50_000, help="rows per insert and commit")
+    parser.add_argument("--complete-ratio", type=float, default=0.5)
+    parser.add_argument("--seed",           type=int, default=0)
+    parser.add_argument("--database-url",   default=settings.DATABASE_URL)
+    return parser.parse_args(argv)
+
+async def main(argv=None):
+    args     = parse_args(argv)
+    engine   = create_app_engine(args.database_url)
+    progress = Progress(args.users * (1 + args.tasks_per_user))
+    try:
+        await seed_database(
+            engine,
+            users          = args.users,
+            tasks_per_user = args.tasks_per_user,
+            password       = args.password,
+            prefix         = args.prefix,
+            batch_size     = args.batch_size,
+            complete_ratio = args.complete_ratio,
+            seed           = args.seed,
+            progress       = progress,
+        )
+    finally:
+        progress.finish()
+        await engine.dispose()
+
+    print(f"Seeded {args.users:,} users and {args.users * args.tasks_per_user:,} tasks "
+          f"in {time.perf_counter() - progress.started:.1f}s ({progress.rate:,.0f} rows/s)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,267 @@
+"""Load test for a running instance of the app.
+
+Seeds users and tasks through the API, then drives every endpoint with concurrent
+async clients and writes p50/p95/p99 latency and throughput per endpoint to JSON:
+
+    DATABASE_URL=sqlite:///bench.db uvicorn app.main:app
+    python -m test.benchmark.load_test --output results.json
+
+    # later, on another commit
+    python -m test.benchmark.load_test --output new.json --baseline results.json --threshold 0.2
+
+Exits with 1 when a request fails or an endpoint regressed beyond the threshold.
+"""
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+# endpoint -> status code a successful request answers with
+ENDPOINTS = {
+    "login":  303,
+    "list":   200,
+    "get":    200,
+    "post":   201,
+    "switch": 200,
+    "change": 200,
+    "delete": 200,
+}
+SEED_CHUNK = 200
+LIST_LIMIT = 50
+
+@dataclass
+class LoadTestConfig:
+    users:          int = 10
+    tasks_per_user: int = 1000
+    requests:       int = 2000
+    # bcrypt bounds login to a few dozen requests/s, so it gets a smaller share
+    login_requests: int = 200
+    concurrency:    int = 32
+    password:       str = "benchmark"
+    seed:           int = 0
+
+@dataclass
+class VirtualUser:
+    username: str
+    token:    str
+    task_ids: list[int] = field(default_factory=list)
+
+    @property
+    def headers(self) -> dict:
+        return {"Cookie": f"access_token={self.token}"}
+
+def percentile(latencies: list[float], q: int) -> float:
+    if len(latencies) < 2:
+        return latencies[0] if latencies else 0.0
+    return statistics.quantiles(latencies, n=100, method="inclusive")[q - 1]
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    return {
+        "requests":       len(latencies),
+        "errors":         errors,
+        "p50_ms":         round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms":         round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms":         round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms":        round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+    }
+
+async def seed(client: httpx.AsyncClient, config: LoadTestConfig, run_id: str) -> list[VirtualUser]:
+    """Registers the users and fills their task lists through the API."""
+    users = []
+    for number in range(config.users):
+        username = f"bench_{run_id}_{number}"
+        response = await client.post("/register/", data={"username": username, "password": config.password})
+        response.raise_for_status()
+        client.cookies.clear()
+        users.append(VirtualUser(username, response.cookies["access_token"]))
+
+    for user in users:
+        for start in range(0, config.tasks_per_user, SEED_CHUNK):
+            contents = [f"Task {i} of {user.username}" for i in range(start, min(start + SEED_CHUNK, config.tasks_per_user))]
+            response = await client.get("/post/", params=[("task_content", c) for c in contents], headers=user.headers)
+            response.raise_for_status()
+            user.task_ids.extend(task["id"] for task in response.json()["tasks"])
+    return users
+
+def build_scenarios(users: list[VirtualUser], config: LoadTestConfig, rng: random.Random) -> dict:
+    """One coroutine factory per endpoint, each call issues a single request."""
+
+    def owned_task(user: VirtualUser) -> int:
+        return rng.choice(user.task_ids)
+
+    async def login(client):
+        user = rng.choice(users)
+        return await client.post(
+            "/login/", data={"username": user.username, "password": config.password}, follow_redirects=False
+        )
+
+    async def list_tasks(client):
+        user = rng.choice(users)
+        return await client.get("/", params={"limit": LIST_LIMIT}, headers=user.headers)
+
+    async def get_task(client):
+        user = rng.choice(users)
+        return await client.get(f"/get/{owned_task(user)}", headers=user.headers)
+
+    async def post_task(client):
+        user = rng.choice(users)
+        response = await client.get("/post/", params={"task_content": "Load test task"}, headers=user.headers)
+        if response.status_code == 201:
+            user.task_ids.extend(task["id"] for task in response.json()["tasks"])
+        return response
+
+    async def switch_task(client):
+        user = rng.choice(users)
+        return await client.get(f"/switch/{owned_task(user)}/", headers=user.headers)
+
+    async def change_task(client):
+        user = rng.choice(users)
+        return await client.get(
+            f"/change/{owned_task(user)}/", params={"task_content": "Changed by load test"}, headers=user.headers
+        )
+
+    # every task is deleted at most once, so deletes draw from a shuffled pool which
+    # is filled on first use, after the post scenario added its tasks
+    deletable = []
+
+    async def delete_task(client):
+        if not deletable:
+            deletable.extend((user, task_id) for user in users for task_id in user.task_ids)
+            rng.shuffle(deletable)
+        user, task_id = deletable.pop()
+        user.task_ids.remove(task_id)
+        return await client.get(f"/delete/{task_id}", headers=user.headers)
+
+    return {
+        "login":  login,
+        "list":   list_tasks,
+        "get":    get_task,
+        "post":   post_task,
+        "switch": switch_task,
+        "change": change_task,
+        "delete": delete_task,
+    }
+
+async def run_scenario(client: httpx.AsyncClient, scenario, expected_status: int, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors    = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await scenario(client)
+                failed   = response.status_code != expected_status
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+async def run_load_test(client: httpx.AsyncClient, config: LoadTestConfig) -> dict:
+    rng    = random.Random(config.seed)
+    run_id = f"{int(time.time())}_{rng.randrange(10**6)}"
+    users  = await seed(client, config, run_id)
+
+    scenarios = build_scenarios(users, config, rng)
+    results   = {}
+    for name, expected_status in ENDPOINTS.items():
+        total = config.login_requests if name == "login" else config.requests
+        results[name] = await run_scenario(client, scenarios[name], expected_status, total, config.concurrency)
+
+    return {
+        "meta": {
+            "base_url":  str(client.base_url),
+            "commit":    git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "config":    asdict(config),
+        },
+        "endpoints": results,
+    }
+
+def compare_reports(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Lists endpoints whose p95/p99 latency grew or throughput dropped by more than threshold."""
+    regressions = []
+    for name, stats in current["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if base is None:
+            continue
+
+        for metric in ("p95_ms", "p99_ms"):
+            if base[metric] and stats[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {base[metric]} -> {stats[metric]}")
+        if base["throughput_rps"] and stats["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput_rps {base['throughput_rps']} -> {stats['throughput_rps']}")
+    return regressions
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test every endpoint of a running instance")
+    parser.add_argument("--url",            default="http://localhost:8000")
+    parser.add_argument("--users",          type=int, default=LoadTestConfig.users)
+    parser.add_argument("--tasks-per-user", type=int, default=LoadTestConfig.tasks_per_user)
+    parser.add_argument("--requests",       type=int, default=LoadTestConfig.requests, help="requests per endpoint")
+    parser.add_argument("--login-requests", type=int, default=LoadTestConfig.login_requests)
+    parser.add_argument("--concurrency",    type=int, default=LoadTestConfig.concurrency)
+    parser.add_argument("--seed",           type=int, default=LoadTestConfig.seed)
+    parser.add_argument("--output",         default="load_test_results.json")
+    parser.add_argument("--baseline",       help="earlier results to compare against")
+    parser.add_argument("--threshold",      type=float, default=0.2, help="allowed relative regression")
+    return parser.parse_args(argv)
+
+async def main(argv=None) -> int:
+    args   = parse_args(argv)
+    config = LoadTestConfig(
+        users          = args.users,
+        tasks_per_user = args.tasks_per_user,
+        requests       = args.requests,
+        login_requests = args.login_requests,
+        concurrency    = args.concurrency,
+        seed           = args.seed,
+    )
+
+    limits = httpx.Limits(max_connections=config.concurrency, max_keepalive_connections=config.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        report = await run_load_test(client, config)
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"{'endpoint':<8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7}")
+    for name, stats in report["endpoints"].items():
+        print(f"{name:<8} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+              f"{stats['throughput_rps']:>9.1f} {stats['errors']:>7}")
+
+    failed = sum(stats["errors"] for stats in report["endpoints"].values()) > 0
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare_reports(report, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,69 @@
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import Task
+
+TASKS = 10_000
+ROUNDS = 3
+
+def seed_tasks(client, test_engine, user_id: int):
+    async def seed():
+        async with AsyncSession(test_engine) as session:
+            await session.exec(insert(Task), params=[
+                {"user_id": user_id, "task_content": f"Task {i}", "is_complete": i % 2 == 0}
+                for i in range(TASKS)
+            ])
+            await session.commit()
+
+    client.portal.call(seed)
+
+def rows_per_second(client, test_engine, render) -> float:
+    async def run():
+        async with AsyncSession(test_engine) as session:
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                body = await render(session)
+            return time.perf_counter() - start, body
+
+    elapsed, body = client.portal.call(run)
+    assert body.count(b'"id"') == TASKS
+    return TASKS * ROUNDS / elapsed
+
+def test_listing_projection_benchmark(client, test_engine, create_user):
+    user = create_user(username="user", password="123")
+    seed_tasks(client, test_engine, user["user_id"])
+
+    # listing as it was: full Task objects, a dict per row and an encoder pass
+    async def hydrated(session):
+        session.expunge_all()
+        tasks = (await session.exec(select(Task).where(Task.user_id == user["user_id"]))).all()
+        res = [
+            {"task_content": task.task_content, "is_complete": task.is_complete, "user_id": user["user_id"], "id": task.id}
+            for task in tasks
+        ]
+        return JSONResponse({"tasks": jsonable_encoder(res)}).body
+
+    # listing as it is now: projected columns rendered straight into the response
+    async def projected(session):
+        rows = (await session.exec(
+            select(Task.id, Task.task_content, Task.is_complete)
+            .where(Task.user_id == user["user_id"])
+            .order_by(Task.id)
+        )).all()
+        res = [
+            {"task_content": task_content, "is_complete": is_complete, "user_id": user["user_id"], "id": task_id}
+            for task_id, task_content, is_complete in rows
+        ]
+        return ORJSONResponse({"tasks": res}).body
+
+    before = rows_per_second(client, test_engine, hydrated)
+    after  = rows_per_second(client, test_engine, projected)
+
+    print(f"\nlisting {TASKS} tasks: hydrated={before:,.0f} rows/s projected={after:,.0f} rows/s "
+          f"speedup={after / before:.1f}x")
+    assert after > before
@@ -0,0 +1,34 @@
+import httpx
+
+from app.main import app
+from test.benchmark.load_test import ENDPOINTS, LoadTestConfig, run_load_test, compare_reports
+
+
+def test_load_test_smoke(client):
+    # tiny run through the ASGI app so the harness keeps working as the endpoints change,
+    # one client only since the in-memory test database shares a single connection
+    config = LoadTestConfig(users=2, tasks_per_user=30, requests=20, login_requests=5, concurrency=1)
+
+    async def run():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http_client:
+            return await run_load_test(http_client, config)
+
+    report = client.portal.call(run)
+
+    assert list(report["endpoints"]) == list(ENDPOINTS)
+    for name, stats in report["endpoints"].items():
+        print(f"\n{name}: {stats}")
+        assert stats["requests"] == (config.login_requests if name == "login" else config.requests)
+        assert stats["errors"] == 0
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+
+    assert compare_reports(report, report, threshold=0.2) == []
+
+def test_compare_reports_flags_regressions():
+    baseline = {"endpoints": {"list": {"p95_ms": 10.0, "p99_ms": 20.0, "throughput_rps": 1000.0}}}
+    current  = {"endpoints": {"list": {"p95_ms": 11.0, "p99_ms": 30.0, "throughput_rps": 700.0}}}
+
+    assert compare_reports(current, baseline, threshold=0.2) == [
+        "list: p99_ms 20.0 -> 30.0",
+        "list: throughput_rps 1000.0 -> 700.0",
+    ]
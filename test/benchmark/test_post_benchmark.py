@@ -0,0 +1,47 @@
+import time
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.main import create_tasks
+from app.models import Task, User
+
+BATCHES = [10, 1_000, 50_000]
+# the per-row refresh loop is only timed where it finishes in reasonable time
+LEGACY_BATCHES = [10, 1_000]
+
+def tasks_per_second(client, test_engine, insert, batch: int) -> float:
+    async def run():
+        async with AsyncSession(test_engine, expire_on_commit=False) as session:
+            start = time.perf_counter()
+            created = await insert(session, [f"Task {i}" for i in range(batch)])
+            return time.perf_counter() - start, created
+
+    elapsed, created = client.portal.call(run)
+    assert created == batch
+    return batch / elapsed
+
+def test_post_bulk_insert_benchmark(client, test_engine, create_user):
+    user_data = create_user(username="user", password="123")
+    user      = User(id=user_data["user_id"], username="user", hashed_password="", is_admin=False)
+
+    # post_tasks as it was: add_all, commit, then a refresh per task
+    async def add_all_and_refresh(session, contents):
+        new_tasks = [Task(id=None, is_complete=False, user_id=user.id, task_content=tc) for tc in contents]
+        session.add_all(new_tasks)
+        await session.commit()
+        for task in new_tasks:
+            await session.refresh(task)
+        return len(new_tasks)
+
+    async def bulk_insert(session, contents):
+        return len(await create_tasks(session, user, contents))
+
+    print()
+    for batch in BATCHES:
+        after = tasks_per_second(client, test_engine, bulk_insert, batch)
+        line  = f"post {batch:>6} tasks: bulk insert={after:,.0f} tasks/s"
+        if batch in LEGACY_BATCHES:
+            before = tasks_per_second(client, test_engine, add_all_and_refresh, batch)
+            line  += f" add_all+refresh={before:,.0f} tasks/s speedup={after / before:.1f}x"
+            assert after > before
+        print(line)
@@ -0,0 +1,33 @@
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+SIZES = [1_000, 10_000]
+ROUNDS = 5
+
+def make_payload(size: int) -> dict:
+    return {"tasks": [
+        {"task_content": f"Task number {i}", "is_complete": i % 2 == 0, "user_id": 1, "id": i}
+        for i in range(size)
+    ]}
+
+def render_time(render, payload: dict) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        body = render(payload)
+    assert body.startswith(b'{"tasks":')
+    return (time.perf_counter() - start) / ROUNDS
+
+def test_serialization_benchmark():
+    print()
+    for size in SIZES:
+        payload = make_payload(size)
+
+        # as before: encoder pass plus the stdlib json response
+        before = render_time(lambda content: JSONResponse(jsonable_encoder(content)).body, payload)
+        after  = render_time(lambda content: ORJSONResponse(content).body, payload)
+
+        print(f"serialize {size:>6} tasks: jsonable_encoder+json={before * 1e3:.2f}ms orjson={after * 1e3:.2f}ms "
+              f"speedup={before / after:.1f}x")
+        assert after < before
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from sqlalchemy import insert, select, text
+
+from app.database import create_app_engine, create_db_and_tables
+from app.models import Task
+
+WRITERS = 4
+READERS = 4
+WRITES_PER_WRITER = 50
+READS_PER_READER = 200
+
+def concurrent_throughput(url: str) -> float:
+    async def run():
+        engine = create_app_engine(url)
+        await create_db_and_tables(engine)
+
+        async def writer(n: int):
+            for i in range(WRITES_PER_WRITER):
+                async with engine.begin() as conn:
+                    await conn.execute(insert(Task), {"user_id": n, "task_content": f"Task {i}", "is_complete": False})
+
+        async def reader(n: int):
+            for _ in range(READS_PER_READER):
+                async with engine.connect() as conn:
+                    await conn.execute(select(Task.id).where(Task.user_id == n).order_by(Task.id.desc()).limit(10))
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(writer(n) for n in range(WRITERS)),
+            *(reader(n) for n in range(READERS)),
+        )
+        elapsed = time.perf_counter() - start
+
+        async with engine.connect() as conn:
+            journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        await engine.dispose()
+        return (WRITERS * WRITES_PER_WRITER + READERS * READS_PER_READER) / elapsed, journal_mode
+
+    return asyncio.run(run())
+
+def test_sqlite_performance_mode_benchmark(tmp_path, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "SQLITE_PERFORMANCE_MODE", False)
+    before, journal_before = concurrent_throughput(f"sqlite:///{tmp_path / 'default.db'}")
+
+    monkeypatch.setattr(settings, "SQLITE_PERFORMANCE_MODE", True)
+    after, journal_after = concurrent_throughput(f"sqlite:///{tmp_path / 'tuned.db'}")
+
+    print(f"\nsqlite {WRITERS} writers + {READERS} readers: {journal_before}={before:,.0f} ops/s "
+          f"{journal_after}={after:,.0f} ops/s speedup={after / before:.1f}x")
+    assert journal_before == "delete"
+    assert journal_after  == "wal"
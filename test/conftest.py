@@ -7,47 +7,37 @@ load_dotenv(".env.test", override=True)
 
 from fastapi.testclient import TestClient
 from app.main import app
-from app.database import get_session
-from sqlmodel import SQLModel, create_engine, Session
-from app.core.config import Settings
+from app.database import get_session, create_app_engine, create_db_and_tables, drop_db_and_tables
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.cache import user_cache, listing_cache
 from app.core.config import Settings
 test_settings = Settings()
 
-@pytest.fixture(scope="session")
+@pytest.fixture(scope="function")
 def test_engine():
-    engine = create_engine(
-        url=test_settings.DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
-
-    SQLModel.metadata.create_all(engine)
+    # in-memory sqlite lives as long as the engine's single static connection,
+    # so a fresh engine per test gives each test an empty database
+    engine = create_app_engine(test_settings.DATABASE_URL)
     
     yield engine
-    
-    SQLModel.metadata.drop_all(engine)
-    engine.dispose()
-    
-@pytest.fixture(scope="function")
-def session(test_engine):
-    connection = test_engine.connect()
-    transaction = connection.begin()
-    session = Session(bind=connection)
-
-    yield session
-    
-    session.close()
-    transaction.rollback()
-    connection.close()    
 
 @pytest.fixture(scope="function")
-def client(session):
-    def override_get_session():
-        yield session
+def client(test_engine):
+    async def override_get_session():
+        async with AsyncSession(test_engine, expire_on_commit=False) as session:
+            yield session
 
     app.dependency_overrides[get_session] = override_get_session
     
     with TestClient(app) as c:
+        c.portal.call(create_db_and_tables, test_engine)
+        c.portal.call(user_cache.clear)
+        listing_cache.clear()
+        
         yield c
+        
+        c.portal.call(drop_db_and_tables, test_engine)
+        c.portal.call(test_engine.dispose)
 
     app.dependency_overrides.clear()
 
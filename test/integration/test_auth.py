@@ -73,4 +73,53 @@ def test_logout_401_error(client):
 
     assert response.json() == {
         "detail": "Could not validate credentials"
-    }
\ No newline at end of file
+    }
+
+def test_registration_503_error(client, monkeypatch):
+    from app.core.config import settings
+    from app.core.security import password_pool_stats
+
+    monkeypatch.setattr(settings, "PASSWORD_POOL_SIZE", 0)
+    monkeypatch.setattr(settings, "PASSWORD_POOL_MAX_QUEUE", 0)
+    rejected = password_pool_stats["rejected"]
+
+    response = client.post("/register/",
+                           data={"username": "user",
+                                 "password": "123"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert response.json() == {
+        "detail": "Server is busy, try again later"
+    }
+    assert password_pool_stats["rejected"] == rejected + 1
+
+
+def test_current_user_cache(client, test_engine, create_user):
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from app.core.cache import user_cache
+    from app.models import User
+
+    new_user = create_user(username ="user",
+                           password= "123")
+    client.cookies["access_token"] = new_user["token"]
+    hits, misses = user_cache.stats["hits"], user_cache.stats["misses"]
+
+    assert client.get("/").status_code == 200
+    assert client.get("/").status_code == 200
+    assert user_cache.stats["misses"] == misses + 1
+    assert user_cache.stats["hits"]   == hits + 1
+
+    async def disable_user():
+        async with AsyncSession(test_engine) as session:
+            user = await session.get(User, new_user["user_id"])
+            user.is_disabled = True
+            session.add(user)
+            await session.commit()
+
+    client.portal.call(disable_user)
+
+    response = client.get("/")
+    assert response.status_code == 400
+    assert response.json() == {
+        "detail": "Inactive user"
+    }
@@ -0,0 +1,143 @@
+from sqlmodel import delete
+
+import app.main as app_main
+from app.models import Task
+
+def test_batch_operations(client, create_user, create_task, default_start_test_sequence):
+    default_user, response_create_2_tasks = default_start_test_sequence
+
+    create_task(
+        token = default_user["token"],
+        params = [
+            ("task_content", "Third task"),
+        ]
+    )
+
+    second_default_user = create_user(
+        username="user2",
+        password="123"
+    )
+    create_task(
+        token = second_default_user["token"],
+        params = [
+            ("task_content", "Foreign task"),
+        ]
+    )
+
+    client.cookies["access_token"] = default_user["token"]
+
+    response = client.post("/batch/", json={"operations": [
+        {"op": "switch", "id": 1},
+        {"op": "change", "id": 2, "task_content": "Changed content"},
+        {"op": "delete", "id": 3},
+        {"op": "switch", "id": 4},
+        {"op": "delete", "id": 99},
+    ]})
+    assert response.status_code == 200
+    assert response.json() == {
+        "message": "3 of 5 operations applied successfully",
+        "results": [
+            {
+                "op": "switch", "id": 1, "status": 200,
+                "task": {"user_id": 1, "task_content": "First task", "complete": True, "id": 1},
+            },
+            {
+                "op": "change", "id": 2, "status": 200,
+                "task": {"user_id": 1, "task_content": "Changed content", "complete": False, "id": 2},
+            },
+            {
+                "op": "delete", "id": 3, "status": 200,
+            },
+            {
+                "op": "switch", "id": 4, "status": 403,
+                "detail": "User with id=1 do not have access to the task with id=4",
+            },
+            {
+                "op": "delete", "id": 99, "status": 404,
+                "detail": "Task with id=99 not found",
+            },
+        ]
+    }
+
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.json() == {
+                "tasks": [
+                {
+                    "user_id": 1,
+                    "task_content": "First task",
+                    "is_complete": True,
+                    "id": 1
+                },
+                {
+                    "user_id": 1,
+                    "task_content": "Changed content",
+                    "is_complete": False,
+                    "id": 2
+                },]}
+
+def test_batch_duplicate_ids_422_error(client, create_user, create_task, default_start_test_sequence):
+    response = client.post("/batch/", json={"operations": [
+        {"op": "switch", "id": 1},
+        {"op": "delete", "id": 1},
+    ]})
+    assert response.status_code == 422
+    assert response.json() == {
+            "detail":"Unprocessable queries: every task id can appear only once in a batch. For more info visit /help/",
+            }
+
+def test_batch_change_without_content_422_error(client, create_user, create_task, default_start_test_sequence):
+    response = client.post("/batch/", json={"operations": [
+        {"op": "change", "id": 1},
+    ]})
+    assert response.status_code == 422
+
+def test_batch_change_too_long_422_error(client, create_user, create_task, default_start_test_sequence):
+    from app.core.config import settings
+
+    response = client.post("/batch/", json={"operations": [
+        {"op": "switch", "id": 1},
+        {"op": "change", "id": 2, "task_content": "x" * (settings.MAX_LETERS_USER + 1)},
+    ]})
+    assert response.status_code == 422
+    assert response.json() == {
+            "detail": f"Content for the Task is too long, a user can use at most {settings.MAX_LETERS_USER} letters per task",
+            }
+
+    # nothing of the batch was applied
+    response = client.get("/")
+    assert [(task["task_content"], task["is_complete"]) for task in response.json()["tasks"]] == [
+        ("First task", False), ("Second task", False)
+    ]
+
+def test_batch_tasks_deleted_concurrently_404_error(client, create_task, default_start_test_sequence, monkeypatch):
+    default_user, response_create_2_tasks = default_start_test_sequence
+    create_task(
+        token = default_user["token"],
+        params = [
+            ("task_content", "Third task"),
+        ]
+    )
+
+    # another request deletes tasks 1 and 3 after the ownership check of the batch
+    delete_owned_tasks = app_main.delete_owned_tasks
+    async def racing_delete_owned_tasks(session, user, task_ids):
+        await session.exec(delete(Task).where(Task.id.in_([1, 3])))
+        return await delete_owned_tasks(session, user, task_ids)
+    monkeypatch.setattr(app_main, "delete_owned_tasks", racing_delete_owned_tasks)
+
+    client.cookies["access_token"] = default_user["token"]
+    response = client.post("/batch/", json={"operations": [
+        {"op": "switch", "id": 1},
+        {"op": "delete", "id": 2},
+        {"op": "delete", "id": 3},
+    ]})
+    assert response.status_code == 200
+    assert response.json() == {
+        "message": "1 of 3 operations applied successfully",
+        "results": [
+            {"op": "switch", "id": 1, "status": 404, "detail": "Task with id=1 not found"},
+            {"op": "delete", "id": 2, "status": 200},
+            {"op": "delete", "id": 3, "status": 404, "detail": "Task with id=3 not found"},
+        ]
+    }
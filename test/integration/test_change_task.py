@@ -59,3 +59,18 @@ def test_change_task_403_error(client, create_user, create_task, default_start_t
     assert response.json() == {
             "detail":"User with id=2 do not have access to the task with id=1",
             }
+
+def test_change_task_too_long_422_error(client, create_user, create_task, default_start_test_sequence):
+    from app.core.config import settings
+
+    response = client.get("/change/1",
+                          params=[
+                              ("task_content", "x" * (settings.MAX_LETERS_USER + 1))
+                          ])
+    assert response.status_code == 422
+    assert response.json() == {
+            "detail": f"Content for the Task is too long, a user can use at most {settings.MAX_LETERS_USER} letters per task",
+            }
+
+    response = client.get("/get/1")
+    assert response.json()["task"]["task_content"] == "First task"
@@ -67,3 +67,39 @@ def test_delete_task_403_error(client, create_user, create_task, default_start_t
     assert response.json() == {
             "detail":"User with id=2 do not have access to the task with id=1",
             }
+
+
+def test_delete_tasks_by_ids(client, create_user, create_task, default_start_test_sequence):
+    default_user, response_create_2_tasks = default_start_test_sequence
+
+    second_default_user = create_user(
+        username="user2",
+        password="123"
+    )
+    create_task(
+        token = second_default_user["token"],
+        params = [
+            ("task_content", "Third task"),
+        ]
+    )
+
+    client.cookies["access_token"] = default_user["token"]
+
+    response = client.get("/delete/", params={"ids": "1,2,3,99"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "message":     "2 tasks deleted successfuly",
+        "deleted":     [1, 2],
+        "not_deleted": [3, 99],
+    }
+
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.json() == {"tasks": []}
+
+def test_delete_tasks_by_ids_422_error(client, create_user, create_task, default_start_test_sequence):
+    response = client.get("/delete/", params={"ids": "1,two"})
+    assert response.status_code == 422
+    assert response.json() == {
+            "detail":"Unprocessable queries: ids must be comma separated integers, got '1,two'. For more info visit /help/",
+            }
@@ -0,0 +1,78 @@
+import hashlib
+
+def test_listing_not_modified(client, create_user, create_task, default_start_test_sequence):
+    default_user, response_create_2_tasks = default_start_test_sequence
+
+    response = client.get("/")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    # a matching version answers without running the listing query
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert 'db-count;desc="1"' in response.headers["server-timing"]
+
+    # other query parameters are another representation
+    response = client.get("/", params={"only_complete": True}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+    for write in ("/switch/1/", "/change/1/?task_content=Changed", "/post/?task_content=Third", "/delete/3"):
+        assert client.get(write).status_code in (200, 201)
+
+        response = client.get("/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        etag = response.headers["etag"]
+
+def test_failed_write_keeps_etag(client, create_user, create_task, default_start_test_sequence):
+    default_user, response_create_2_tasks = default_start_test_sequence
+    etag = client.get("/").headers["etag"]
+
+    assert client.get("/switch/99/").status_code == 404
+    assert client.get("/delete/", params={"ids": "98,99"}).status_code == 200
+
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 304
+
+def test_get_task_not_modified(client, create_user, create_task, default_start_test_sequence):
+    default_user, response_create_2_tasks = default_start_test_sequence
+
+    response = client.get("/get/1")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert client.get("/get/2").headers["etag"] != etag
+
+    response = client.get("/get/1", headers={"If-None-Match": f'W/"other", {etag}'})
+    assert response.status_code == 304
+
+    client.get("/switch/1/")
+    response = client.get("/get/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["task"]["is_complete"] == True
+
+def test_etag_is_per_user(client, create_user, create_task, default_start_test_sequence):
+    default_user, response_create_2_tasks = default_start_test_sequence
+    etag = client.get("/").headers["etag"]
+
+    other_user = create_user(username="other", password="123")
+    client.cookies["access_token"] = other_user["token"]
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == {"tasks": []}
+
+def test_get_task_not_modified_checks_access(client, create_user, create_task, default_start_test_sequence):
+    default_user, response_create_2_tasks = default_start_test_sequence
+
+    other_user = create_user(username="other", password="123")
+    client.cookies["access_token"] = other_user["token"]
+
+    # tags are predictable, a forged one must not reveal other users' or missing tasks
+    for task_id, status_code in ((1, 403), (99, 404)):
+        digest = hashlib.blake2b(f"/get/{task_id}?".encode(), digest_size=8).hexdigest()
+        forged = f'"{other_user["user_id"]}-0-{digest}"'
+        response = client.get(f"/get/{task_id}", headers={"If-None-Match": forged})
+        assert response.status_code == status_code
@@ -0,0 +1,54 @@
+import json
+
+
+def test_export_tasks_ndjson(client, create_user, create_task, default_start_test_sequence):
+    response = client.get("/switch/2/")
+    assert response.status_code == 200
+
+    response = client.get("/export/")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {
+            "user_id": 1,
+            "task_content": "First task",
+            "is_complete": False,
+            "id": 1
+        },
+        {
+            "user_id": 1,
+            "task_content": "Second task",
+            "is_complete": True,
+            "id": 2
+        },
+    ]
+
+def test_export_tasks_csv(client, create_user, create_task, default_start_test_sequence):
+    response = client.get("/export/", params={"format": "csv",
+                                              "only_uncomplete": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == "attachment; filename=tasks.csv"
+    assert response.text.splitlines() == [
+        "id,user_id,task_content,is_complete",
+        "1,1,First task,False",
+        "2,1,Second task,False",
+    ]
+
+def test_get_tasks_stream(client, create_user, create_task, default_start_test_sequence):
+    response = client.get("/", params={"stream": True,
+                                       "limit": 1,
+                                       "page": 2})
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {
+            "user_id": 1,
+            "task_content": "Second task",
+            "is_complete": False,
+            "id": 2
+        },
+    ]
+
+def test_export_tasks_422_error(client, create_user, create_task, default_start_test_sequence):
+    response = client.get("/export/", params={"format": "xml"})
+    assert response.status_code == 422
@@ -103,3 +103,52 @@ def test_get_task_404_error(client, create_user, create_task):
     assert response.json() == {
             "detail":"Task with id=99 not found",
             }
+
+
+def test_get_tasks_by_ids(client, create_user, create_task, default_start_test_sequence):
+    default_user, response_create_2_tasks = default_start_test_sequence
+
+    second_default_user = create_user(
+        username="user2",
+        password="123"
+    )
+    create_task(
+        token = second_default_user["token"],
+        params = [
+            ("task_content", "Foreign task"),
+        ]
+    )
+
+    client.cookies["access_token"] = default_user["token"]
+
+    response = client.get("/get/", params={"ids": "2,3,1,99"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "tasks": [
+                {
+                    "user_id": 1,
+                    "task_content": "Second task",
+                    "is_complete": False,
+                    "id": 2
+                },
+                {
+                    "user_id": 1,
+                    "task_content": "First task",
+                    "is_complete": False,
+                    "id": 1
+                },
+            ],
+        "missing":   [99],
+        "forbidden": [3],
+        }
+
+def test_get_tasks_by_ids_422_error(client, create_user, create_task, default_start_test_sequence, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "MAX_BATCH_IDS", 2)
+
+    response = client.get("/get/", params={"ids": "1,2,3"})
+    assert response.status_code == 422
+    assert response.json() == {
+            "detail":"Unprocessable queries: at most 2 task ids can be given at once. For more info visit /help/",
+            }
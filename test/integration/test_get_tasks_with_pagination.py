@@ -35,6 +35,7 @@ def test_get_tasks_by_page(client, create_task, create_user):
                     "id": 4
                 },
             ],
+        "total": 6,
         }
     
 def test_get_tasks_by_page_and_compelete_value(client, create_task, create_user):
@@ -83,6 +84,7 @@ def test_get_tasks_by_page_and_compelete_value(client, create_task, create_user)
                     "id": 6
                 },
             ],
+        "total": 2,
         }
 def test_get_tasks_by_page_and_compelete_value_422_error(client, create_task, create_user):
     default_user = create_user(
@@ -103,4 +105,58 @@ def test_get_tasks_by_page_and_compelete_value_422_error(client, create_task, cr
                             ("limit", 0),
                         ])
     assert response.status_code == 422
-    assert response.json() == {"detail":"Unprocessable queries: cannot generate response when amount of tasks in page limit = 0. For more info visit /help/"}
\ No newline at end of file
+    assert response.json() == {"detail":"Unprocessable queries: cannot generate response when amount of tasks in page limit = 0. For more info visit /help/"}
+
+def test_get_tasks_by_cursor(client, create_task, create_user):
+    default_user = create_user(
+        username="user",
+        password="123"
+    )
+
+    response_create_5_tasks = create_task(
+        token = default_user["token"],
+        params = [
+            ("task_content", "First task"),
+            ("task_content", "Second task"),
+            ("task_content", "Third task"),
+            ("task_content", "4th task"),
+            ("task_content", "5th task"),
+        ]
+    )
+    assert response_create_5_tasks.status_code == 201
+
+    response = client.get("/", params={"limit": 2,
+                                       "after_id": 0})
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()["tasks"]] == [1, 2]
+    assert response.json()["next_cursor"] == 2
+
+    response = client.get("/", params={"limit": 2,
+                                       "after_id": 4})
+    assert response.status_code == 200
+    assert response.json() == {
+        "tasks": [
+                {
+                    "user_id": 1,
+                    "task_content": "5th task",
+                    "is_complete": False,
+                    "id": 5
+                },
+            ],
+        "next_cursor": None,
+        "total": 5,
+        }
+
+def test_get_tasks_by_cursor_422_error(client, create_user):
+    default_user = create_user(
+        username="user",
+        password="123"
+    )
+
+    response = client.get("/",
+                        params=[
+                            ("after_id", 2),
+                            ("page",     2),
+                        ])
+    assert response.status_code == 422
+    assert response.json() == {"detail":"Unprocessable queries: cannot generate response when both page and after_id are given. For more info visit /help/"}
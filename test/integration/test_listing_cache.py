@@ -0,0 +1,57 @@
+from app.core.cache import ListingCache, listing_cache
+
+
+def test_listing_served_from_cache(client, create_user, create_task, default_start_test_sequence):
+    default_user, response_create_2_tasks = default_start_test_sequence
+
+    first = client.get("/", params={"limit": 1, "page": 2})
+    assert 'db-count;desc="2"' in first.headers["server-timing"]
+
+    hits   = listing_cache.stats["hits"]
+    second = client.get("/", params={"page": 2, "limit": 1})
+    assert listing_cache.stats["hits"] == hits + 1
+    assert 'db-count;desc="1"' in second.headers["server-timing"]
+    assert second.headers["content-type"] == "application/json"
+    assert second.headers["etag"] == client.get("/", params={"page": 2, "limit": 1}).headers["etag"]
+    assert second.json() == first.json() == {
+        "tasks": [{"task_content": "Second task", "is_complete": False, "user_id": 1, "id": 2}],
+        "total": 2,
+    }
+
+    # a write drops the user's pages and moves the version on
+    client.get("/switch/2/")
+    assert not listing_cache.keys_by_user.get(default_user["user_id"])
+    third = client.get("/", params={"page": 2, "limit": 1})
+    assert third.json()["tasks"][0]["is_complete"] == True
+
+def test_listing_cache_disabled(client, create_user, create_task, default_start_test_sequence, monkeypatch):
+    monkeypatch.setattr("app.main.settings.LISTING_CACHE_ENABLED", False)
+    client.get("/")
+    assert not listing_cache.entries
+    assert 'db-count;desc="2"' in client.get("/").headers["server-timing"]
+
+def test_listing_cache_versions_and_caps():
+    cache = ListingCache(max_entries=2, max_bytes=10)
+
+    cache.set(1, 1, ("a",), b"1234")
+    assert cache.get(1, 1, ("a",)) == b"1234"
+    # another worker wrote: the page rendered at version 1 is dropped
+    assert cache.get(1, 2, ("a",)) is None
+    assert cache.stats["invalidations"] == 1
+    assert cache.size == 0
+
+    cache.set(1, 1, ("a",), b"1234")
+    cache.set(2, 1, ("a",), b"1234")
+    cache.set(3, 1, ("a",), b"1234")
+    assert list(cache.entries) == [(2, ("a",)), (3, ("a",))]
+    cache.set(3, 1, ("b",), b"12345")
+    assert list(cache.entries) == [(3, ("a",)), (3, ("b",))]
+    assert cache.stats["evictions"] == 2
+    assert cache.size == 9
+
+    # bodies over the byte cap are never cached
+    cache.set(4, 1, ("a",), b"x" * 11)
+    assert (4, ("a",)) not in cache.entries
+
+    cache.invalidate(3)
+    assert not cache.entries and not cache.keys_by_user and cache.size == 0
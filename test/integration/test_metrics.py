@@ -0,0 +1,51 @@
+from app.core.metrics import RequestMetrics
+
+
+def test_metrics_by_route_template(client, create_user, create_task, default_start_test_sequence):
+    client.get("/switch/1/")
+    client.get("/switch/2/")
+    client.get("/switch/99/")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    lines = response.text.splitlines()
+    assert 'http_requests_in_flight 1' in lines
+    assert any(line.startswith('http_requests_total{method="GET",route="/switch/{task_id}/",status="200"} ') for line in lines)
+    assert any(line.startswith('http_requests_total{method="GET",route="/switch/{task_id}/",status="404"} ') for line in lines)
+    assert any(line.startswith('http_request_duration_seconds_bucket{method="GET",route="/switch/{task_id}/",le="+Inf"} ') for line in lines)
+    assert not any('route="/switch/1/"' in line for line in lines)
+
+def test_request_metrics_histogram():
+    metrics = RequestMetrics(buckets=(0.1, 1.0))
+    metrics.observe("GET", "/", 200, 0.05)
+    metrics.observe("GET", "/", 200, 0.5)
+    metrics.observe("GET", "/", 500, 5.0)
+
+    lines = metrics.render()
+    assert 'http_requests_total{method="GET",route="/",status="200"} 2' in lines
+    assert 'http_requests_total{method="GET",route="/",status="500"} 1' in lines
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/",le="0.1"} 1' in lines
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/",le="1.0"} 2' in lines
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/",le="+Inf"} 3' in lines
+    assert 'http_request_duration_seconds_count{method="GET",route="/"} 3' in lines
+
+def test_server_timing_counts_queries(client, create_user, create_task, default_start_test_sequence, caplog, monkeypatch):
+    # the first request warms the user and listing caches, after that a listing
+    # only reads the tasks version
+    client.get("/")
+    response = client.get("/")
+    assert response.status_code == 200
+
+    timing = response.headers["server-timing"]
+    assert 'db-count;desc="1"' in timing
+    assert timing.startswith("db;dur=")
+    assert "app;dur=" in timing
+
+    monkeypatch.setattr("app.core.metrics.settings.QUERY_COUNT_BUDGET", 2)
+    with caplog.at_level("WARNING", logger="app.queries"):
+        client.get("/")
+        assert not caplog.records
+        client.post("/batch/", json={"operations": [{"op": "switch", "id": 1}]})
+    assert "POST /batch/ ran 4 queries" in caplog.text
@@ -0,0 +1,51 @@
+import asyncio
+
+from sqlalchemy import inspect, text
+
+from app.database import create_app_engine, create_db_and_tables
+
+def get_index_names(engine, table: str) -> set[str]:
+    async def run():
+        async with engine.connect() as conn:
+            indexes = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_indexes(table))
+        return {index["name"] for index in indexes}
+
+    return asyncio.run(run())
+
+def test_existing_database_picks_up_new_indexes():
+    engine = create_app_engine("sqlite:///:memory:")
+
+    async def create_old_schema():
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE task (id INTEGER PRIMARY KEY, user_id INTEGER, task_content VARCHAR, is_complete BOOLEAN)"))
+            await conn.execute(text("CREATE INDEX ix_task_user_id ON task (user_id)"))
+
+    asyncio.run(create_old_schema())
+    asyncio.run(create_db_and_tables(engine))
+
+    assert get_index_names(engine, "task") >= {
+        "ix_task_user_id_id",
+        "ix_task_user_id_is_complete_id",
+        "ix_task_user_id_id_incomplete",
+    }
+    assert "ix_task_user_id" not in get_index_names(engine, "task")
+
+    asyncio.run(engine.dispose())
+
+def test_uncomplete_listing_uses_index():
+    engine = create_app_engine("sqlite:///:memory:")
+
+    async def explain():
+        await create_db_and_tables(engine)
+        async with engine.connect() as conn:
+            plan = await conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT id, task_content, is_complete FROM task "
+                "WHERE user_id = 1 AND is_complete = 0 ORDER BY id"
+            ))
+            return " ".join(str(row) for row in plan)
+
+    plan = asyncio.run(explain())
+    assert "USING INDEX ix_task_user_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+    asyncio.run(engine.dispose())
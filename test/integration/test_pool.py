@@ -0,0 +1,35 @@
+import asyncio
+
+from sqlmodel import select
+
+from app.database import create_app_engine, get_pool_status, pool_stats
+
+
+def test_get_pool_status(client):
+    response = client.get("/metrics/pool/")
+    assert response.status_code == 200
+    assert response.json()["pool"] == "StaticPool"
+    assert response.json()["timeouts"] == pool_stats["timeouts"]
+
+def test_file_database_pool_settings(tmp_path, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 1)
+    engine    = create_app_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    checkouts = pool_stats["checkouts"]
+
+    async def run():
+        async with engine.connect() as first, engine.connect() as second, engine.connect() as third:
+            for conn in (first, second, third):
+                await conn.execute(select(1))
+            status = get_pool_status(engine)
+        await engine.dispose()
+        return status
+
+    status = asyncio.run(run())
+    assert status["pool"]        == "TimedQueuePool"
+    assert status["size"]        == 2
+    assert status["checked_out"] == 3
+    assert status["overflow"]    == 1
+    assert status["checkouts"]   == checkouts + 3
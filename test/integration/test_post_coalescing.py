@@ -0,0 +1,118 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import WriteCoalescer, settings, user_cache
+from app.database import get_session, create_app_engine, create_db_and_tables, get_pool_status
+from app.main import app, task_insert_coalescer
+
+
+def test_concurrent_posts_share_a_transaction(client, create_user, monkeypatch):
+    monkeypatch.setattr("app.main.settings.POST_COALESCING_ENABLED", True)
+    monkeypatch.setattr(task_insert_coalescer, "max_delay", 0.05)
+    user  = create_user(username="user", password="123")
+    other = create_user(username="other", password="123")
+    client.portal.call(user_cache.clear)
+
+    requests = [
+        (user["token"],  [("task_content", "Same"), ("task_content", "A")]),
+        (other["token"], [("task_content", "Same")]),
+        (user["token"],  [("task_content", "Same")]),
+        (other["token"], [("task_content", "B"), ("task_content", "C")]),
+    ]
+    batches = task_insert_coalescer.stats["batches"]
+
+    async def post_all():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http_client:
+            return await asyncio.gather(*(
+                http_client.get("/post/", params=params, headers={"Cookie": f"access_token={token}"})
+                for token, params in requests
+            ))
+
+    responses = client.portal.call(post_all)
+    assert task_insert_coalescer.stats["batches"] == batches + 1
+    # the batch's writes are not counted against the request which started it,
+    # each request only ran its own user lookup
+    for response in responses:
+        assert 'db-count;desc="1"' in response.headers["server-timing"]
+
+    ids = []
+    for response, (token, params) in zip(responses, requests):
+        assert response.status_code == 201
+        tasks = response.json()["tasks"]
+        assert [task["task_content"] for task in tasks] == [content for _, content in params]
+        ids += [task["id"] for task in tasks]
+    assert sorted(ids) == list(range(1, 7))
+
+    client.cookies["access_token"] = user["token"]
+    assert client.get("/stats/").json()["total"] == 3
+    assert sorted(task["id"] for task in client.get("/").json()["tasks"]) == sorted(
+        task["id"] for response in (responses[0], responses[2]) for task in response.json()["tasks"]
+    )
+
+    lines = client.get("/metrics").text.splitlines()
+    assert 'post_coalesced_batch_rows_bucket{le="10"} 1' in lines
+
+def test_coalesced_posts_fill_the_pool(tmp_path, monkeypatch):
+    # as many concurrent posts as pooled connections, every request loads its user
+    # from the database and the flush still needs a connection of its own
+    monkeypatch.setattr(settings, "POST_COALESCING_ENABLED", True)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 1)
+    monkeypatch.setattr(task_insert_coalescer, "max_delay", 0.05)
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'coalescing.db'}")
+
+    async def override_get_session():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+    monkeypatch.setitem(app.dependency_overrides, get_session, override_get_session)
+
+    with TestClient(app) as client:
+        client.portal.call(create_db_and_tables, engine)
+        tokens = []
+        for username in ("user", "other"):
+            response = client.post("/register/", data={"username": username, "password": "123"})
+            tokens.append(response.cookies["access_token"])
+            client.cookies.clear()
+        client.portal.call(user_cache.clear)
+
+        async def post_all():
+            async with httpx.AsyncClient(app=app, base_url="http://test") as http_client:
+                return await asyncio.gather(*(
+                    http_client.get("/post/", params={"task_content": "Task"}, headers={"Cookie": f"access_token={token}"})
+                    for token in tokens
+                ))
+
+        timeouts  = get_pool_status(engine)["timeouts"]
+        responses = client.portal.call(post_all)
+        assert [response.status_code for response in responses] == [201, 201]
+        assert get_pool_status(engine)["timeouts"] == timeouts
+        client.portal.call(engine.dispose)
+
+def test_coalescer_batches_and_errors():
+    flushed = []
+
+    async def flush(items):
+        flushed.append(items)
+        if "boom" in items:
+            raise RuntimeError("batch failed")
+        return [item.upper() for item in items]
+
+    async def run():
+        coalescer = WriteCoalescer(flush, max_delay=10, max_batch=3)
+        # the third row fills the batch, nobody waits for the delay
+        results = await asyncio.gather(coalescer.submit("a"), coalescer.submit("b", rows=2))
+        assert results == ["A", "B"]
+
+        coalescer.max_delay = 0.01
+        with pytest.raises(RuntimeError):
+            await asyncio.gather(coalescer.submit("boom"), coalescer.submit("c"))
+        return coalescer
+
+    coalescer = asyncio.run(run())
+    assert flushed == [["a", "b"], ["boom", "c"]]
+    assert coalescer.stats == {"batches": 2, "items": 4, "rows": 5}
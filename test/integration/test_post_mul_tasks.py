@@ -84,3 +84,37 @@ def test_post_task_422_error(client, create_user):
     assert response.json() == {
             "detail":"Content for the Task was not given",
             }
+
+
+def test_post_task_too_long_422_error(client, create_task, create_user):
+    from app.core.config import settings
+
+    default_user = create_user(
+        username="user",
+        password="123"
+    )
+
+    response = client.get("/post/", params=[
+        ("task_content", "Short task"),
+        ("task_content", "x" * (settings.MAX_LETERS_USER + 1)),
+    ])
+    assert response.status_code == 422
+    assert response.json() == {
+            "detail": f"Content for the Task is too long, a user can use at most {settings.MAX_LETERS_USER} letters per task",
+            }
+
+    response = client.get("/")
+    assert response.json() == {"tasks": []}
+
+    admin_user = create_user(
+        username="Admin",
+        password="123",
+        is_admin=True
+    )
+    response_create_1_task = create_task(
+        token = admin_user["token"],
+        params = [
+            ("task_content", "x" * (settings.MAX_LETERS_USER + 1)),
+        ]
+    )
+    assert response_create_1_task.status_code == 201
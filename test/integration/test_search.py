@@ -0,0 +1,94 @@
+import asyncio
+
+from sqlalchemy import text
+
+from app.database import create_app_engine, create_db_and_tables
+
+
+def search_ids(client, q: str, **params) -> list[int]:
+    response = client.get("/search/", params={"q": q, **params})
+    assert response.status_code == 200
+    return [task["id"] for task in response.json()["tasks"]]
+
+def test_search_ranks_and_pages(client, create_user, create_task):
+    default_user = create_user(username="user", password="123")
+    create_task(token=default_user["token"], params=[
+        ("task_content", "Buy milk, bread, eggs and some cheese for the weekend"),
+        ("task_content", "Call the plumber"),
+        ("task_content", "Milk"),
+        ("task_content", "Bread and milk"),
+    ])
+
+    # shorter tasks mentioning the word rank first
+    assert search_ids(client, "milk") == [3, 4, 1]
+    assert search_ids(client, "MILK bread") == [4, 1]
+    assert search_ids(client, "milk", limit=2, page=2) == [1]
+    assert search_ids(client, "milk", only_complete=True) == []
+    assert search_ids(client, "dentist") == []
+
+    response = client.get("/search/", params={"q": "plumber"})
+    assert response.json() == {
+        "tasks": [{"task_content": "Call the plumber", "is_complete": False, "user_id": default_user["user_id"], "id": 2}]
+    }
+
+def test_search_follows_writes(client, create_user, create_task, default_start_test_sequence):
+    default_user, response_create_2_tasks = default_start_test_sequence
+    assert search_ids(client, "first") == [1]
+
+    client.get("/change/1/", params={"task_content": "Renamed task"})
+    assert search_ids(client, "first") == []
+    assert search_ids(client, "renamed") == [1]
+
+    client.get("/switch/1/")
+    assert search_ids(client, "renamed", only_complete=True) == [1]
+
+    client.get("/delete/1")
+    assert search_ids(client, "renamed") == []
+    assert search_ids(client, "task") == [2]
+
+def test_search_only_own_tasks(client, create_user, create_task, default_start_test_sequence):
+    other_user = create_user(username="other", password="123")
+    create_task(token=other_user["token"], params=[("task_content", "Other first task")])
+
+    assert search_ids(client, "first") == [3]
+
+def test_search_query_syntax_is_not_interpreted(client, create_user, create_task, default_start_test_sequence):
+    assert search_ids(client, 'first" OR NEAR(task') == []
+    assert search_ids(client, "first*") == [1]
+
+    response = client.get("/search/", params={"q": "  ** "})
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Unprocessable queries: q has to contain at least one word. For more info visit /help/"}
+
+def test_existing_tasks_are_indexed():
+    engine = create_app_engine("sqlite:///:memory:")
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE task (id INTEGER PRIMARY KEY, user_id INTEGER, task_content VARCHAR, is_complete BOOLEAN)"))
+            await conn.execute(text("INSERT INTO task (user_id, task_content, is_complete) VALUES (1, 'water the plants', 0)"))
+
+        await create_db_and_tables(engine)
+        async with engine.connect() as conn:
+            return (await conn.execute(text("SELECT rowid FROM task_fts WHERE task_fts MATCH 'plants'"))).all()
+
+    assert asyncio.run(run()) == [(1,)]
+    asyncio.run(engine.dispose())
+
+def test_missing_trigger_is_recreated_and_index_rebuilt():
+    engine = create_app_engine("sqlite:///:memory:")
+
+    async def run():
+        await create_db_and_tables(engine)
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP TRIGGER task_fts_insert"))
+            await conn.execute(text("INSERT INTO task (user_id, task_content, is_complete) VALUES (1, 'water the plants', 0)"))
+
+        await create_db_and_tables(engine)
+        async with engine.begin() as conn:
+            await conn.execute(text("INSERT INTO task (user_id, task_content, is_complete) VALUES (1, 'repot the plants', 0)"))
+        async with engine.connect() as conn:
+            return (await conn.execute(text("SELECT rowid FROM task_fts WHERE task_fts MATCH 'plants' ORDER BY rowid"))).all()
+
+    assert asyncio.run(run()) == [(1,), (2,)]
+    asyncio.run(engine.dispose())
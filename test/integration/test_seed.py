@@ -0,0 +1,77 @@
+import io
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.seed as app_seed
+from app.models import User, Task
+from app.seed import seed_database, Progress
+
+
+def test_seed_database(client, test_engine, create_user):
+    existing = create_user(username="user", password="123")
+    progress = Progress(total=3 * (1 + 5), stream=io.StringIO())
+
+    written = client.portal.call(lambda: seed_database(
+        test_engine, users=3, tasks_per_user=5, password="seeded", batch_size=4, progress=progress
+    ))
+    assert written == 18
+    assert "18/18 rows (100%)" in progress.stream.getvalue()
+
+    async def counts():
+        async with AsyncSession(test_engine) as session:
+            users = (await session.exec(select(func.count()).select_from(User))).one()
+            tasks = (await session.exec(
+                select(Task.user_id, func.count()).group_by(Task.user_id).order_by(Task.user_id)
+            )).all()
+            return users, tasks
+
+    users, tasks = client.portal.call(counts)
+    assert users == 4
+    assert [count for _, count in tasks] == [5, 5, 5]
+    assert existing["user_id"] not in [user_id for user_id, _ in tasks]
+
+    # seeded users share the precomputed hash and can log in, their counters
+    # agree with the inserted tasks
+    response = client.post("/login/", data={"username": "seed_user_0", "password": "seeded"}, follow_redirects=False)
+    assert response.status_code == 303
+    client.cookies["access_token"] = response.cookies["access_token"]
+    stats = client.get("/stats/").json()
+    assert stats["total"] == 5
+    assert stats["complete"] == sum(task["is_complete"] for task in client.get("/").json()["tasks"])
+
+
+def test_failed_seed_batch_keeps_search_trigger(client, test_engine, create_user, create_task, monkeypatch):
+    insert_rows = app_seed.insert_rows
+    async def failing_insert_rows(conn, table, columns, rows):
+        if table is Task.__table__:
+            raise RuntimeError("interrupted")
+        await insert_rows(conn, table, columns, rows)
+    monkeypatch.setattr(app_seed, "insert_rows", failing_insert_rows)
+
+    with pytest.raises(RuntimeError):
+        client.portal.call(lambda: seed_database(test_engine, users=1, tasks_per_user=5, progress=Progress(6, io.StringIO())))
+
+    async def triggers():
+        async with test_engine.connect() as conn:
+            return (await conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))).scalars().all()
+    assert "task_fts_insert" in client.portal.call(triggers)
+
+    # tasks posted afterwards are still indexed
+    default_user = create_user(username="user", password="123")
+    create_task(token=default_user["token"], params=[("task_content", "Searchable")])
+    assert [task["task_content"] for task in client.get("/search/", params={"q": "searchable"}).json()["tasks"]] == ["Searchable"]
+
+def test_seed_database_twice(client, test_engine):
+    for _ in range(2):
+        client.portal.call(lambda: seed_database(
+            test_engine, users=2, tasks_per_user=1, batch_size=4, progress=Progress(4, io.StringIO())
+        ))
+
+    async def usernames():
+        async with AsyncSession(test_engine) as session:
+            return (await session.exec(select(User.username).order_by(User.id))).all()
+
+    assert client.portal.call(usernames) == ["seed_user_0", "seed_user_1", "seed_user_2", "seed_user_3"]
@@ -0,0 +1,60 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import create_app_engine, create_db_and_tables
+from app.models import TaskStats
+
+
+def test_stats_follow_writes(client, create_user, create_task, default_start_test_sequence):
+    default_user, response_create_2_tasks = default_start_test_sequence
+    assert client.get("/stats/").json() == {"total": 2, "complete": 0, "incomplete": 2}
+
+    create_task(token=default_user["token"], params=[("task_content", "Third task"), ("task_content", "4th task")])
+    client.get("/switch/1/")
+    client.get("/switch/2/")
+    client.get("/switch/2/")
+    client.get("/change/3/", params={"task_content": "Changed"})
+    assert client.get("/stats/").json() == {"total": 4, "complete": 1, "incomplete": 3}
+
+    client.get("/delete/1")
+    client.get("/delete/", params={"ids": "2,99"})
+    assert client.get("/stats/").json() == {"total": 2, "complete": 0, "incomplete": 2}
+
+    response = client.post("/batch/", json={"operations": [
+        {"op": "switch", "id": 3},
+        {"op": "delete", "id": 4},
+    ]})
+    assert response.status_code == 200
+    assert client.get("/stats/").json() == {"total": 1, "complete": 1, "incomplete": 0}
+
+    # failed writes leave the counters alone
+    client.get("/switch/99/")
+    assert client.get("/stats/").json() == {"total": 1, "complete": 1, "incomplete": 0}
+
+def test_stats_are_per_user(client, create_user, create_task, default_start_test_sequence):
+    other_user = create_user(username="other", password="123")
+    client.cookies["access_token"] = other_user["token"]
+    assert client.get("/stats/").json() == {"total": 0, "complete": 0, "incomplete": 0}
+
+def test_existing_tasks_are_counted_once():
+    engine = create_app_engine("sqlite:///:memory:")
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE task (id INTEGER PRIMARY KEY, user_id INTEGER, task_content VARCHAR, is_complete BOOLEAN)"))
+            await conn.execute(text("INSERT INTO task (user_id, task_content, is_complete) VALUES (1, 'a', 1), (1, 'b', 0), (2, 'c', 0)"))
+
+        await create_db_and_tables(engine)
+        # later startups find the table and keep its counters
+        await create_db_and_tables(engine)
+
+        async with AsyncSession(engine) as session:
+            return (await session.exec(select(TaskStats).order_by(TaskStats.user_id))).all()
+
+    stats = asyncio.run(run())
+    assert [(row.user_id, row.total, row.complete) for row in stats] == [(1, 2, 1), (2, 1, 0)]
+
+    asyncio.run(engine.dispose())
@@ -56,3 +56,13 @@ def test_switch_task_403_error(client, create_user, create_task, default_start_t
     assert response.json() == {
             "detail":"User with id=2 do not have access to the task with id=1",
             }
+
+
+def test_switch_task_twice(client, create_user, create_task, default_start_test_sequence):
+    response = client.get("/switch/2/")
+    assert response.status_code == 200
+    assert response.json()["task"]["complete"] == True
+
+    response = client.get("/switch/2/")
+    assert response.status_code == 200
+    assert response.json()["task"]["complete"] == False